@@ -2,12 +2,14 @@ import json
 import os
 import sys
 import configparser as config
+from copy import deepcopy
 from pathlib import Path
 from shutil import copy
 
 from datetime import datetime
 from loguru import logger
-from file import base_directory, read_conf, write_conf, save_data_to_json, path
+from file import base_directory, read_conf, write_conf, save_data_to_json, path, save_conf, config_transaction, \
+    get_snapshot, HideMode, load_default_conf, theme_registry
 
 import list
 
@@ -19,6 +21,8 @@ name = 'Class Widgets'
 
 PLUGINS_DIR = Path(base_directory) / 'plugins'
 
+_schedule_cache = {}  # 已解析的课程表 {文件名: ((mtime_ns, size), 数据)}
+
 # app 图标
 if os.name == 'nt':
     app_icon = os.path.join(base_directory, 'img', 'favicon.ico')
@@ -30,30 +34,35 @@ else:
 
 def load_from_json(filename):
     """
-    从 JSON 文件中加载数据。
+    从 JSON 文件中加载数据，文件未变化时直接返回缓存。
     :param filename: 要加载的文件
-    :return: 返回从文件中加载的数据字典
+    :return: 返回从文件中加载的数据字典（各处共享，请勿直接修改）
     """
+    file_path = f'{base_directory}/config/schedule/{filename}'
     try:
-        with open(f'{base_directory}/config/schedule/{filename}', 'r', encoding='utf-8') as file:
+        stat = os.stat(file_path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = _schedule_cache.get(filename)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        with open(file_path, 'r', encoding='utf-8') as file:
             data = json.load(file)
-            return data
+        _schedule_cache[filename] = (stamp, data)
+        return data
     except Exception as e:
         logger.error(f"加载数据时出错: {e}")
         return None
 
 
-def load_theme_config(theme):
-    try:
-        with open(f'{base_directory}/ui/{theme}/theme.json', 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            return data
-    except FileNotFoundError:
-        logger.warning(f"主题配置文件 {theme} 不存在，返回默认配置")
-        return f'{base_directory}/ui/default/theme.json'
-    except Exception as e:
-        logger.error(f"加载主题数据时出错: {e}")
-        return None
+def invalidate_schedule(filename=None):  # 丢弃课程表缓存（不指定则全部丢弃）
+    if filename is None:
+        _schedule_cache.clear()
+    else:
+        _schedule_cache.pop(filename, None)
+
+
+def load_theme_config(theme):  # 兼容插件，请使用 theme_registry.get(theme)（返回可修改的副本，与原先的 json.load 一致）
+    return deepcopy(dict(theme_registry.get(theme).data))
 
 
 def load_plugin_config():
@@ -94,28 +103,24 @@ def save_installed_plugin(data):
         return False
 
 
-def load_theme_width(theme):
-    try:
-        with open(f'{base_directory}/ui/{theme}/theme.json', 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            return data['widget_width']
-    except Exception as e:
-        logger.error(f"加载主题宽度时出错: {e}")
-        return list.widget_width
+def load_theme_width(theme):  # 兼容插件，请使用 theme_registry.get(theme).widget_width
+    return theme_registry.get(theme).widget_width
 
 
 def is_temp_week():
-    if read_conf('Temp', 'set_week') is None or read_conf('Temp', 'set_week') == '':
+    set_week = get_snapshot().set_week
+    if set_week is None:
         return False
     else:
-        return read_conf('Temp', 'set_week')
+        return str(set_week)
 
 
 def is_temp_schedule():
-    if read_conf('Temp', 'temp_schedule') is None or read_conf('Temp', 'temp_schedule') == '':
+    temp_schedule = get_snapshot().temp_schedule
+    if temp_schedule == '':
         return False
     else:
-        return read_conf('Temp', 'temp_schedule')
+        return temp_schedule
 
 
 def add_shortcut_to_startmenu(file='', icon=''):
@@ -219,19 +224,14 @@ def remove_from_startup():
 
 
 def get_time_offset():  # 获取时差偏移
-    time_offset = read_conf('General', 'time_offset')
-    if time_offset is None or time_offset == '' or time_offset == '0':
-        return 0
-    else:
-        return int(time_offset)
+    return get_snapshot().time_offset
 
 
 def get_custom_countdown():  # 获取自定义倒计时
-    custom_countdown = read_conf('Date', 'countdown_date')
-    if custom_countdown is None or custom_countdown == '':
+    custom_countdown = get_snapshot().countdown_date
+    if custom_countdown is None:
         return '未设置'
     else:
-        custom_countdown = datetime.strptime(custom_countdown, '%Y-%m-%d')
         if custom_countdown < datetime.now():
             return '0 天'
         else:
@@ -243,9 +243,8 @@ def get_custom_countdown():  # 获取自定义倒计时
 
 
 def get_week_type():  # 获取单双周
-    if read_conf('Date', 'start_date') != '':
-        start_date = read_conf('Date', 'start_date')
-        start_date = datetime.strptime(start_date, '%Y-%m-%d')
+    start_date = get_snapshot().start_date
+    if start_date is not None:
         today = datetime.now()
         week_num = (today - start_date).days // 7 + 1
         if week_num % 2 == 0:
@@ -303,43 +302,47 @@ def load_plugins():  # 加载插件配置文件
     return plugin_dict
 
 
-def check_config():
+def migrate_config(data, default_conf):  # 按默认配置补全缺失项并记录版本，返回是否有修改
+    changed = False
+    for section, options in default_conf.items():
+        if not data.has_section(section):
+            data.add_section(section)
+        for key, value in options.items():
+            if not data.has_option(section, key):
+                data.set(section, key, str(value))
+                changed = True
+    if data.get('Other', 'version', raw=True) != default_conf['Other']['version']:
+        data.set('Other', 'version', default_conf['Other']['version'])
+        changed = True
+    return changed
+
+
+def check_config():  # 启动时迁移/修复配置文件（仅运行一次，最多写入一次）
     conf = config.ConfigParser()
-    with open(f'{base_directory}/config/default_config.json', 'r', encoding='utf-8') as file:  # 加载默认配置
-        default_conf = json.load(file)
+    default_conf = load_default_conf()  # 加载默认配置
 
-    if not os.path.exists('config.ini'):  # 如果配置文件不存在，则copy默认配置文件
+    if not os.path.exists(path):  # 如果配置文件不存在，则copy默认配置文件
         conf.read_dict(default_conf)
-        with open(path, 'w', encoding='utf-8') as configfile:
-            conf.write(configfile)
         if sys.platform != 'win32':
             conf.set('General', 'hide_method', '2')
-            with open(path, 'w', encoding='utf-8') as configfile:
-                conf.write(configfile)
+        save_conf(conf)
         logger.info("配置文件不存在，已创建并写入默认配置。")
         copy(f'{base_directory}/config/default.json', f'{base_directory}/config/schedule/新课表 - 1.json')
     else:
-        with open(path, 'r', encoding='utf-8') as configfile:
-            conf.read_file(configfile)
-
-        if conf['Other']['version'] != default_conf['Other']['version']:  # 如果配置文件版本不同，则更新配置文件
+        try:
+            with open(path, 'r', encoding='utf-8') as configfile:
+                conf.read_file(configfile)
+        except Exception as e:  # 配置文件损坏，备份后按默认配置重建
+            logger.error(f"读取配置文件失败，已备份至 config.ini.bak 并重新生成: {e}")
+            copy(path, f'{path}.bak')
+            conf = config.ConfigParser()
+
+        if conf.get('Other', 'version', fallback=None) != default_conf['Other']['version']:
             logger.info(f"配置文件版本不同，将重新适配")
-            try:
-                for section, options in default_conf.items():
-                    if section not in conf:
-                        conf[section] = options
-                    else:
-                        for key, value in options.items():
-                            if key not in conf[section]:
-                                conf[section][key] = str(value)
-                conf.set('Other', 'version', default_conf['Other']['version'])
-                with open(path, 'w', encoding='utf-8') as configfile:
-                    conf.write(configfile)
-                logger.info(f"配置文件已更新")
-            except Exception as e:
-                logger.error(f"配置文件更新失败: {e}")
+        changed = migrate_config(conf, default_conf)
 
-        if not os.path.exists(f"{base_directory}/config/schedule/{read_conf('General', 'schedule')}"):  # 如果config.ini课程表不存在，则创建
+        schedule = conf.get('General', 'schedule', raw=True)
+        if not os.path.exists(f"{base_directory}/config/schedule/{schedule}"):  # 如果config.ini课程表不存在，则创建
 
             schedule_config = []
             # 遍历目标目录下的所有文件
@@ -349,11 +352,18 @@ def check_config():
                     # 将文件路径添加到列表
                     schedule_config.append(file_name)
             if not schedule_config:
-                copy(f'{base_directory}/config/default.json', f'{base_directory}/config/schedule/{read_conf("General", "schedule")}')
+                copy(f'{base_directory}/config/default.json', f'{base_directory}/config/schedule/{schedule}')
                 logger.info(f"课程表不存在，已创建默认课程表")
             else:
-                write_conf('General', 'schedule', schedule_config[0])
-        print(os.path.join(os.getcwd(), 'config', 'schedule'))
+                conf.set('General', 'schedule', schedule_config[0])
+                changed = True
+
+        if changed:
+            try:
+                save_conf(conf)
+                logger.info(f"配置文件已更新")
+            except Exception as e:
+                logger.error(f"配置文件更新失败: {e}")
 
     # 判断是否存在 Plugins 文件夹
     plugins_dir = Path(base_directory) / 'plugins'
@@ -3,7 +3,6 @@ import sys
 import os
 from shutil import copy
 
-from PyQt5 import uic
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QApplication, QScroller
@@ -16,6 +15,7 @@ import conf
 from conf import base_directory
 import list
 from menu import SettingsMenu
+from utils import load_ui
 
 # 适配高DPI缩放
 QApplication.setHighDpiScaleFactorRoundingPolicy(
@@ -66,7 +66,7 @@ class ExactMenu(FluentWindow):
     def __init__(self):
         super().__init__()
         self.menu = None
-        self.interface = uic.loadUi(f'{base_directory}/view/exact_menu.ui')
+        self.interface = load_ui(f'{base_directory}/view/exact_menu.ui')
         self.initUI()
         self.init_interface()
 
@@ -106,13 +106,14 @@ class ExactMenu(FluentWindow):
     def save_temp_conf(self):
         try:
             temp_week = self.findChild(ComboBox, 'select_temp_week')
-            if temp_schedule != {'schedule': {}, 'schedule_even': {}}:
-                if conf.read_conf('Temp', 'temp_schedule') == '':  # 备份检测
-                    copy(f'{base_directory}/config/schedule/{filename}', f'{base_directory}/config/schedule/backup.json')  # 备份课表配置
-                    logger.info(f'备份课表配置成功：已将 {filename} -备份至-> backup.json')
-                    conf.write_conf('Temp', 'temp_schedule', filename)
-                conf.save_data_to_json(temp_schedule, filename)
-            conf.write_conf('Temp', 'set_week', str(temp_week.currentIndex()))
+            with conf.config_transaction():
+                if temp_schedule != {'schedule': {}, 'schedule_even': {}}:
+                    if conf.read_conf('Temp', 'temp_schedule') == '':  # 备份检测
+                        copy(f'{base_directory}/config/schedule/{filename}', f'{base_directory}/config/schedule/backup.json')  # 备份课表配置
+                        logger.info(f'备份课表配置成功：已将 {filename} -备份至-> backup.json')
+                        conf.write_conf('Temp', 'temp_schedule', filename)
+                    conf.save_data_to_json(temp_schedule, filename)
+                conf.write_conf('Temp', 'set_week', str(temp_week.currentIndex()))
             Flyout.create(
                 icon=InfoBarIcon.SUCCESS,
                 title='保存成功',
@@ -1,5 +1,10 @@
 import json
 import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from enum import IntEnum
+from types import MappingProxyType
 
 from loguru import logger
 import configparser as config
@@ -13,55 +18,347 @@ path = f'{base_directory}/config.ini'
 
 
 # CONFIG
-# 读取config
-def read_conf(section='General', key=''):
-    data = config.ConfigParser()
+_conf_cache = None  # 已解析的 config.ini
+_conf_stamp = None  # 缓存对应的文件状态 (mtime_ns, size)
+_default_conf = None  # 已解析的 default_config.json
+_transaction = None  # 批量写入中尚未落盘的config
+_transaction_owner = None  # 开启事务的线程
+_write_lock = threading.RLock()  # 事务期间其他线程的写入需等待提交
+_snapshot = None  # 当前config的快照
+
+
+def _file_stamp():  # 获取配置文件状态，用于判断缓存是否失效
     try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_default_conf():  # 读取默认配置（仅解析一次）
+    global _default_conf
+    if _default_conf is None:
+        with open(f'{base_directory}/config/default_config.json', encoding="utf-8") as default:
+            _default_conf = json.load(default)
+    return _default_conf
+
+
+def get_conf():  # 获取缓存的config，文件变化时才重新解析
+    global _conf_cache, _conf_stamp
+    stamp = _file_stamp()
+    if stamp is None:
+        _conf_cache = None
+        _conf_stamp = None
+        raise FileNotFoundError(path)
+    if _conf_cache is None or stamp != _conf_stamp:
+        data = config.ConfigParser()
         with open(path, 'r', encoding='utf-8') as configfile:
             data.read_file(configfile)
+        _conf_cache = data
+        _conf_stamp = stamp
+    return _conf_cache
+
+
+def _copy_conf(source):  # 复制ConfigParser（保留原始值，不做插值）
+    data = config.ConfigParser()
+    for section in source.sections():
+        data.add_section(section)
+        for key, value in source.items(section, raw=True):
+            data.set(section, key, value)
+    return data
+
+
+def invalidate_conf():  # 丢弃缓存，下次读取时重新解析
+    global _conf_cache, _conf_stamp
+    _conf_cache = None
+    _conf_stamp = None
+
+
+def save_conf(data):  # 原子写入config（先写临时文件再替换）
+    global _conf_cache, _conf_stamp
+    temp_path = f'{path}.tmp'
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as configfile:
+            data.write(configfile)
+            configfile.flush()
+            os.fsync(configfile.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:  # 写入失败时清理临时文件
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    _conf_cache = data
+    _conf_stamp = _file_stamp()
+
+
+@contextmanager
+def config_transaction():
+    """
+    批量修改config，退出时只写入一次。
+    期间本线程的 write_conf 仅修改内存，read_conf 可读到未落盘的值；发生异常则放弃全部修改。
+    其他线程的 write_conf 会等待事务提交后再写入，read_conf 读到的仍是已落盘的值。
+    嵌套调用直接并入外层事务：内层抛出的异常若未被捕获会放弃整个事务，
+    若在外层被捕获则内层已做的修改仍会随外层一起提交，无法单独回滚。
+    """
+    global _transaction, _transaction_owner
+    if _current_transaction() is not None:  # 嵌套时并入外层
+        yield _transaction
+        return
+    with _write_lock:
+        try:
+            _transaction = _copy_conf(get_conf())
+        except FileNotFoundError:
+            _transaction = config.ConfigParser()
+        _transaction_owner = threading.get_ident()
+        try:
+            yield _transaction
+            save_conf(_transaction)
+        finally:
+            _transaction = None
+            _transaction_owner = None
+
+
+def _current_transaction():  # 当前线程开启的事务（其他线程的事务不可见）
+    if _transaction_owner == threading.get_ident():
+        return _transaction
+    return None
+
+
+# 读取config
+def read_conf(section='General', key=''):
+    try:
+        data = _current_transaction()
+        if data is None:
+            data = get_conf()
     except FileNotFoundError:
         return None
     except Exception as e:
         logger.error(f'读取配置文件时出错: {e}')
         return None
-    with open(f'{base_directory}/config/default_config.json', encoding="utf-8") as default:
-        default_data = json.load(default)
+    default_data = load_default_conf()
 
+    # 缺失项已在启动时由 conf.check_config 补全，此处仅回退到默认值，不写入文件
     if section in data and key in data[section]:
         return data[section][key]
     elif section in data and key == '':
-        return data[section]
+        return dict(data[section])
     elif section in default_data and key in default_data[section]:
-        write_conf(section, key, default_data[section][key])
-        logger.info('配置文件出现问题，已尝试修复')
-        return default_data[section][key]
+        return str(default_data[section][key])
     elif section in default_data and key == '':
-        write_conf(section, '', default_data[section])
-        logger.info('配置文件出现问题，已尝试修复')
-        return default_data[section]
+        return {k: str(v) for k, v in default_data[section].items()}
     else:
         return None
 
 
 # 写入config
 def write_conf(section, key, value):
-    data = config.ConfigParser()
+    transaction = _current_transaction()
+    if transaction is not None:
+        if section not in transaction:
+            transaction.add_section(section)
+        transaction.set(section, key, str(value))
+        return
+
+    with _write_lock:
+        try:
+            data = _copy_conf(get_conf())  # 复制一份，避免修改已交出的缓存
+        except FileNotFoundError:
+            data = config.ConfigParser()
+        except Exception as e:
+            logger.error(f'读取配置文件时出错: {e}')
+            return None
+
+        if section not in data:
+            data.add_section(section)
+
+        data.set(section, key, str(value))
+        save_conf(data)
+
+
+class HideMode(IntEnum):  # 自动隐藏模式
+    NONE = 0  # 无
+    IN_CLASS = 1  # 上课时自动隐藏
+    MAXIMIZED = 2  # 窗口最大化时隐藏
+
+
+class ConfigSnapshot:  # 预先转换好类型的config，配置变化时重建
+    __slots__ = (
+        'source',
+        'schedule', 'theme', 'opacity', 'margin', 'time_offset', 'hide', 'hide_method', 'pin_on_top',
+        'color_mode', 'enable_alt_schedule', 'blur_countdown', 'safe_mode',
+        'toast_wave', 'toast_pin_on_top', 'prepare_minutes',
+        'toast_attend_class', 'toast_finish_class', 'toast_prepare_class',
+        'attend_class_color', 'finish_class_color', 'prepare_class_color',
+        'weather_city', 'weather_api', 'weather_api_key', 'weather_cache_ttl', 'weather_cache_max_age',
+        'start_date', 'countdown_date', 'cd_text_custom',
+        'set_week', 'temp_schedule',
+    )
+
+    def __init__(self, data, default_data):
+        def get(section, key):
+            if data.has_option(section, key):
+                return data.get(section, key, raw=True)
+            return str(default_data.get(section, {}).get(key, ''))
+
+        def get_int(section, key, fallback=0):
+            for value in (get(section, key), default_data.get(section, {}).get(key)):
+                try:
+                    return int(value)
+                except (TypeError, ValueError):
+                    continue
+            return fallback
+
+        def get_date(section, key):
+            try:
+                return datetime.strptime(get(section, key), '%Y-%m-%d')
+            except ValueError:
+                return None
+
+        self.source = data
+
+        self.schedule = get('General', 'schedule')
+        self.theme = get('General', 'theme')
+        self.opacity = get_int('General', 'opacity', 100) / 100
+        self.margin = get_int('General', 'margin')
+        self.time_offset = get_int('General', 'time_offset')
+        try:
+            self.hide = HideMode(get_int('General', 'hide'))
+        except ValueError:
+            self.hide = HideMode.NONE
+        self.hide_method = get_int('General', 'hide_method')
+        self.pin_on_top = get_int('General', 'pin_on_top')
+        self.color_mode = get_int('General', 'color_mode')
+        self.enable_alt_schedule = get('General', 'enable_alt_schedule') == '1'
+        self.blur_countdown = get('General', 'blur_countdown') == '1'
+        self.safe_mode = get('Other', 'safe_mode') == '1'
+
+        self.toast_wave = get('Toast', 'wave') == '1'
+        self.toast_pin_on_top = get('Toast', 'pin_on_top') == '1'
+        self.prepare_minutes = get_int('Toast', 'prepare_minutes')
+        self.toast_attend_class = get('Toast', 'attend_class') == '1'
+        self.toast_finish_class = get('Toast', 'finish_class') == '1'
+        self.toast_prepare_class = get('Toast', 'prepare_class') == '1'
+
+        self.attend_class_color = f"#{get('Color', 'attend_class')}"
+        self.finish_class_color = f"#{get('Color', 'finish_class')}"
+        self.prepare_class_color = f"#{get('Color', 'prepare_class')}"
+
+        self.weather_city = get('Weather', 'city')
+        self.weather_api = get('Weather', 'api')
+        self.weather_api_key = get('Weather', 'api_key')
+        self.weather_cache_ttl = get_int('Weather', 'cache_ttl', 1800)  # 缓存有效期（秒），期间不请求网络
+        self.weather_cache_max_age = get_int('Weather', 'cache_max_age', 86400)  # 过期缓存最长可用于显示的时间（秒）
+
+        self.start_date = get_date('Date', 'start_date')
+        self.countdown_date = get_date('Date', 'countdown_date')
+        self.cd_text_custom = get('Date', 'cd_text_custom')
+
+        set_week = get('Temp', 'set_week')
+        self.set_week = int(set_week) if set_week.isdigit() else None  # 调休日
+        self.temp_schedule = get('Temp', 'temp_schedule')
+
+
+def get_snapshot():  # 获取当前config的快照（仅在config变化后重建）
+    global _snapshot
+    transaction = _current_transaction()
+    if transaction is not None:  # 事务中与 read_conf 一致，读取未落盘的值（不缓存）
+        return ConfigSnapshot(transaction, load_default_conf())
     try:
-        with open(path, 'r', encoding='utf-8') as configfile:
-            data.read_file(configfile)
+        data = get_conf()
     except FileNotFoundError:
-        pass
+        data = None
     except Exception as e:
         logger.error(f'读取配置文件时出错: {e}')
-        return None
+        data = None
+    if data is None:
+        data = _snapshot.source if _snapshot is not None else config.ConfigParser()
+    if _snapshot is None or _snapshot.source is not data:
+        _snapshot = ConfigSnapshot(data, load_default_conf())
+    return _snapshot
 
-    if section not in data:
-        data.add_section(section)
 
-    data.set(section, key, str(value))
+# THEME
+class ThemeConfig:  # 主题配置（theme.json），加载后只读
+    __slots__ = (
+        'folder', 'name', 'support_dark_mode', 'default_theme', 'radius', 'spacing', 'shadow', 'height',
+        'widget_width', 'data',
+    )
+
+    def __init__(self, folder, data):
+        self.folder = folder
+        self.data = MappingProxyType(data)  # 原始数据
+        self.name = data.get('name', folder)
+        self.support_dark_mode = bool(data.get('support_dark_mode', False))
+        self.default_theme = data.get('default_theme')
+        self.radius = data.get('radius', 0)
+        self.spacing = int(data.get('spacing', 0))
+        self.shadow = bool(data.get('shadow', False))
+        self.height = int(data.get('height', 125))
+        self.widget_width = MappingProxyType(dict(data.get('widget_width', {})))
+
+
+class ThemeRegistry:  # 主题注册表，每个主题的 theme.json 只加载一次，主题文件夹变化时失效
+    def __init__(self, ui_directory):
+        self.ui_directory = ui_directory
+        self.folders = []  # 可用的主题文件夹（与 names 一一对应，原地更新）
+        self.names = []  # 主题名称
+        self.themes = {}
+        self.scanned = False
+
+    def load(self, folder):
+        try:
+            with open(f'{self.ui_directory}/{folder}/theme.json', 'r', encoding='utf-8') as file:
+                return ThemeConfig(folder, json.load(file))
+        except Exception as e:
+            logger.error(f'加载主题文件 theme.json {folder} 发生错误，跳过：{e}')
+            return None
+
+    def scan(self):  # 扫描全部主题
+        themes = {}
+        try:
+            folders = [f for f in os.listdir(self.ui_directory) if os.path.isdir(os.path.join(self.ui_directory, f))]
+        except OSError as e:
+            logger.error(f'扫描主题文件夹时出错：{e}')
+            folders = []
+        for folder in folders:
+            theme = self.load(folder)
+            if theme is not None:
+                themes[folder] = theme
+        self.themes = themes
+        self.folders[:] = themes.keys()
+        self.names[:] = [theme.name for theme in themes.values()]
+        self.scanned = True
+
+    def invalidate(self, folder=None):  # 主题文件夹或某个 theme.json 变化后调用
+        if folder is None or not self.scanned:
+            self.scan()
+            return
+        theme = self.load(folder)
+        if theme is None:
+            self.themes.pop(folder, None)
+        else:
+            self.themes[folder] = theme
+        self.folders[:] = self.themes.keys()
+        self.names[:] = [theme.name for theme in self.themes.values()]
+
+    def get(self, folder):
+        if not self.scanned:
+            self.scan()
+        theme = self.themes.get(folder)
+        if theme is not None:
+            return theme
+        if folder != 'default':
+            logger.warning(f'主题配置文件 {folder} 不存在，使用默认主题')
+            return self.get('default')
+        logger.error('默认主题配置文件不存在')
+        theme = ThemeConfig('default', {})
+        self.themes['default'] = theme
+        return theme
+
 
-    with open(path, 'w', encoding='utf-8') as configfile:
-        data.write(configfile)
+theme_registry = ThemeRegistry(f'{base_directory}/ui')
 
 
 # JSON
@@ -4,7 +4,7 @@ from copy import deepcopy
 from shutil import copy
 
 from loguru import logger
-from file import read_conf, write_conf, save_data_to_json, base_directory
+from file import read_conf, write_conf, save_data_to_json, base_directory, theme_registry
 
 week = ['周一', '周二', '周三', '周四', '周五', '周六', '周日']
 week_type = ['单周', '双周']
@@ -15,8 +15,8 @@ hide_mode = ['无', '上课时自动隐藏', '窗口最大化时隐藏']
 non_nt_hide_mode = ['无', '上课时自动隐藏']
 version_channel = ['正式版 (Release)', '测试版 (Beta)']
 
-theme_folder = []
-theme_names = []
+theme_folder = theme_registry.folders  # 由主题注册表维护
+theme_names = theme_registry.names
 
 subject = {
     '语文': '(255, 151, 135',  # 红
@@ -107,8 +107,6 @@ try:  # 加载课程/主题配置文件
     subject_info = json.load(open(f'{base_directory}/config/data/subject.json', 'r', encoding='utf-8'))
     subject_icon = subject_info['subject_icon']
     subject_abbreviation = subject_info['subject_abbreviation']
-    theme_folder = [f for f in os.listdir(f'{base_directory}/ui/')
-                    if os.path.isdir(os.path.join(f'{base_directory}/ui/', f))]
 except Exception as e:
     logger.error(f'加载课程/主题配置文件发生错误，使用默认配置：{e}')
     write_conf('General', 'theme', 'default')
@@ -141,18 +139,7 @@ except Exception as e:
         '历史': '史'
     }
 
-not_exist_themes = []
-
-for folder in theme_folder:
-    try:
-        json_file = json.load(open(f'{base_directory}/ui/{folder}/theme.json', 'r', encoding='utf-8'))
-        theme_names.append(json_file['name'])
-    except Exception as e:
-        logger.error(f'加载主题文件 theme.json {folder} 发生错误，跳过：{e}')
-        not_exist_themes.append(folder)
-
-for folder in not_exist_themes:
-    theme_folder.remove(folder)
+theme_registry.scan()  # 加载主题列表
 
 
 def get_widget_list():
@@ -1,20 +1,23 @@
+import bisect
 import ctypes
 import datetime as dt
+import heapq
 import json
+import math
 import os
 import platform
 import re
 import subprocess
 import sys
+import time
 import traceback
+from collections import deque
 from shutil import copy
 from typing import Optional
 
-from PyQt5 import uic
-from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QRect, QEasingCurve, QSize, QPoint, QUrl
-from PyQt5.QtGui import QColor, QIcon, QPixmap, QPainter, QDesktopServices
+from PyQt5.QtCore import Qt, QObject, QTimer, QPropertyAnimation, QRect, QEasingCurve, QSize, QPoint, QUrl
+from PyQt5.QtGui import QColor, QIcon, QPixmap, QDesktopServices
 from PyQt5.QtGui import QFontDatabase
-from PyQt5.QtSvg import QSvgRenderer
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QProgressBar, QGraphicsBlurEffect, QPushButton, \
     QGraphicsDropShadowEffect, QSystemTrayIcon, QFrame, QGraphicsOpacityEffect, QHBoxLayout
 from loguru import logger
@@ -51,7 +54,6 @@ filename = conf.read_conf('General', 'schedule')
 
 # 存储窗口对象
 windows = []
-order = []
 error_dialog = None
 
 current_lesson_name = '课程表未加载'
@@ -59,14 +61,11 @@ current_state = 0  # 0：课间 1：上课 2: 休息段
 current_time = dt.datetime.now().strftime('%H:%M:%S')
 current_week = dt.datetime.now().weekday()
 current_lessons = {}
+current_seconds = 0  # 当前时间（当日秒数）
 loaded_data = {}
-parts_type = []
 notification = tip_toast
-update_timer = QTimer()
 
-timeline_data = {}
 next_lessons = []
-parts_start_time = []
 
 temperature = '未设置'
 weather_icon = 0
@@ -82,6 +81,7 @@ ignore_errors = []
 last_error_time = dt.datetime.now() - error_cooldown  # 上一次错误
 
 ex_menu = None
+fw = None  # 浮窗
 
 if conf.read_conf('Other', 'do_not_log') != '1':
     logger.add(f"{base_directory}/log/ClassWidgets_main_{{time}}.log", rotation="1 MB", encoding="utf-8",
@@ -92,7 +92,7 @@ else:
 
 
 def global_exceptHook(exc_type, exc_value, exc_tb):  # 全局异常捕获
-    if conf.read_conf('Other', 'safe_mode') == '1':  # 安全模式
+    if conf.get_snapshot().safe_mode:  # 安全模式
         return
 
     error_details = ''.join(traceback.format_exception(exc_type, exc_value, exc_tb))  # 异常详情
@@ -151,86 +151,150 @@ def get_timeline_data():
 
 # 获取Part开始时间
 def get_start_time():
-    global parts_start_time, timeline_data, loaded_data, order, parts_type
-    loaded_data = conf.load_from_json(filename)
-    timeline = get_timeline_data()
-    part = loaded_data['part']
-    parts_start_time = []
-    timeline_data = {}
-    order = []
+    global loaded_data, schedule_revision
+    data = conf.load_from_json(filename)  # 文件未变化时返回同一对象
+    if data is not loaded_data:
+        loaded_data = data
+        schedule_revision += 1  # 课程表已重新加载，需重新编译时间线
 
-    for item_name, item_value in part.items():
-        try:
-            h, m = item_value[:2]
-            try:
-                part_type = item_value[2]
-            except IndexError:
-                part_type = 'part'
-            except Exception as e:
-                logger.error(f'加载课程表文件[节点类型]出错：{e}')
-                part_type = 'part'
 
-            parts_start_time.append(dt.datetime.combine(today, dt.time(h, m)))
-            order.append(item_name)
-            parts_type.append(part_type)
-        except Exception as e:
-            logger.error(f'加载课程表文件[起始时间]出错：{e}')
+class DayPlan:  # 编译后的当日时间线（按时间排序的数组，使用 bisect 查询）
+    __slots__ = (
+        'part_keys', 'part_names', 'part_types', 'part_starts', 'part_ends', 'part_max_ends', 'part_ranges',
+        'part_has_lesson', 'starts', 'ends', 'kinds', 'parts', 'lessons'
+    )
 
-    paired = zip(parts_start_time, order)
-    paired_sorted = sorted(paired, key=lambda x: x[0])  # 按时间大小排序
-    if paired_sorted:
-        parts_start_time, order = zip(*paired_sorted)
+    def __init__(self):
+        # 节点（按开始时间排序）
+        self.part_keys = []  # 节点序号
+        self.part_names = []  # 节点名称
+        self.part_types = []  # 节点类型 part/break
+        self.part_starts = []  # 开始时间（当日秒数）
+        self.part_ends = []  # 结束时间（当日秒数）
+        self.part_max_ends = []  # 结束时间前缀最大值，用于二分查找
+        self.part_ranges = []  # 节点内活动在下方数组中的范围 [lo, hi)
+        self.part_has_lesson = []  # 节点内是否有课程
+        # 活动区间 (start_sec, end_sec, kind, part, lesson)
+        self.starts = []
+        self.ends = []
+        self.kinds = []  # a：课程 f：课间
+        self.parts = []
+        self.lessons = []
+
+    def find_part(self, t):  # 第一个未结束的节点，全部结束则返回最后一个
+        if not self.part_keys:
+            return None
+        return min(bisect.bisect_left(self.part_max_ends, t), len(self.part_keys) - 1)
+
+
+day_plan = DayPlan()
+day_plan_key = None
+schedule_revision = 0
+
+
+def parse_timeline_item(item_name, part_keys, last_key, last_index):  # 解析时间线项目所属节点（区分 a1x 与 a10x）
+    rest = item_name[1:]
+    candidates = [
+        (key, int(rest[len(key):])) for key in part_keys if rest.startswith(key) and rest[len(key):].isdigit()
+    ]
+    if not candidates:
+        return None
+    for key, index in candidates:  # 优先视为当前节点的后续活动
+        if key == last_key and index >= last_index:
+            return key, index
+    return max(candidates, key=lambda c: (c[1] <= 1, len(c[0])))  # 否则为新节点的第一个活动
 
-    for item_name, item_time in timeline.items():
+
+def compile_day_plan():  # 编译当日时间线（课程表或日期变化时）
+    global day_plan
+    plan = DayPlan()
+    parts = []
+    for item_name, item_value in loaded_data.get('part', {}).items():
         try:
-            timeline_data[item_name] = item_time
+            h, m = item_value[:2]
+            part_type = item_value[2] if len(item_value) > 2 else 'part'
+            parts.append((h * 3600 + m * 60, item_name, part_type))
         except Exception as e:
+            logger.error(f'加载课程表文件[起始时间]出错：{e}')
+    parts.sort(key=lambda x: x[0])  # 按时间大小排序
+
+    part_keys = [key for _, key, _ in parts]
+    part_items = {key: [] for key in part_keys}
+    last_key, last_index = None, 0
+    for item_name, item_time in get_timeline_data().items():
+        parsed = parse_timeline_item(item_name, part_keys, last_key, last_index)
+        if parsed is None:
+            logger.warning(f'时间线项目 {item_name} 不属于任何节点，已跳过')
+            continue
+        last_key, last_index = parsed
+        try:
+            duration = int(item_time) * 60
+        except (TypeError, ValueError) as e:
             logger.error(f'加载课程表文件[课程数据]出错：{e}')
+            continue
+        if item_name.startswith('a'):
+            lesson = current_lessons.get(item_name, '暂无课程')
+        else:
+            lesson = '课间'
+        part_items[last_key].append((item_name[0], duration, lesson))
+
+    part_names = loaded_data.get('part_name', {})
+    for start, key, part_type in parts:
+        items = part_items[key]
+        if not items:  # 无活动的节点不参与计算
+            continue
+        lo = len(plan.starts)
+        c_time = start
+        for kind, duration, lesson in items:
+            plan.starts.append(c_time)
+            plan.ends.append(c_time + duration)
+            plan.kinds.append(kind)
+            plan.parts.append(int(key))
+            plan.lessons.append(lesson)
+            c_time += duration
+        plan.part_keys.append(int(key))
+        plan.part_names.append(part_names.get(key, ''))
+        plan.part_types.append(part_type)
+        plan.part_starts.append(start)
+        plan.part_ends.append(c_time)
+        plan.part_max_ends.append(max(c_time, plan.part_max_ends[-1]) if plan.part_max_ends else c_time)
+        plan.part_ranges.append((lo, len(plan.starts)))
+        plan.part_has_lesson.append(any(kind == 'a' for kind, _, _ in items))
+    day_plan = plan
+    if bell_scheduler is not None:
+        bell_scheduler.replan()
+
+
+def get_current_seconds():  # 当前时间（当日秒数，已扣除时差偏移）
+    return current_seconds - time_offset
 
 
 def get_part():
-    if not parts_start_time:
+    p = day_plan.find_part(get_current_seconds())
+    if p is None:
         return None
-
-    def return_data():
-        c_time = parts_start_time[i] + dt.timedelta(seconds=time_offset)
-        return c_time, int(order[i])  # 返回开始时间、Part序号
-
-    current_dt = dt.datetime.now()
-
-    for i in range(len(parts_start_time)):  # 遍历每个Part
-        time_len = dt.timedelta(minutes=0)  # Part长度
-
-        for item_name, item_time in timeline_data.items():
-            if item_name.startswith(f'a{str(order[i])}') or item_name.startswith(f'f{str(order[i])}'):
-                time_len += dt.timedelta(minutes=int(item_time))  # 累计Part的时间点总长度
-            time_len += dt.timedelta(seconds=1)
-
-        if time_len != dt.timedelta(seconds=1):  # 有课程
-            if i == len(parts_start_time) - 1:  # 最后一个Part
-                return return_data()
-            else:
-                if current_dt <= parts_start_time[i] + time_len:
-                    return return_data()
-
-    return parts_start_time[0] + dt.timedelta(seconds=time_offset), 0, 'part'
+    c_time = dt.datetime.combine(today, dt.time()) + dt.timedelta(seconds=day_plan.part_starts[p] + time_offset)
+    return c_time, day_plan.part_keys[p]  # 返回开始时间、Part序号
 
 
 # 获取当前活动
 def get_current_lessons():  # 获取当前课程
-    global current_lessons
+    global current_lessons, day_plan_key
     timeline = get_timeline_data()
-    if conf.read_conf('General', 'enable_alt_schedule') == '1':
+    even_week = False
+    if conf.get_snapshot().enable_alt_schedule:
         try:
-            if conf.get_week_type():
-                schedule = loaded_data.get('schedule_even')
-            else:
-                schedule = loaded_data.get('schedule')
+            even_week = bool(conf.get_week_type())
         except Exception as e:
             logger.error(f'加载课程表文件[单双周]出错：{e}')
-            schedule = loaded_data.get('schedule')
-    else:
-        schedule = loaded_data.get('schedule')
+    schedule = loaded_data.get('schedule_even' if even_week else 'schedule')
+
+    key = (schedule_revision, str(current_week), even_week, today)
+    if key == day_plan_key:  # 课程表与日期均未变化
+        return
+    day_plan_key = key
+
+    current_lessons = {}
     class_count = 0
     for item_name, _ in timeline.items():
         if item_name.startswith('a'):
@@ -249,105 +313,328 @@ def get_current_lessons():  # 获取当前课程
             else:
                 current_lessons[item_name] = '暂无课程'
                 class_count += 1
+    compile_day_plan()
+
+
+def build_bell_events(plan, prepare_minutes):  # 由当日时间线计算全部提醒（时间, 类型, 课程名）
+    events = []
+    for p, (lo, hi) in enumerate(plan.part_ranges):
+        after_school = False  # 每个节点只提醒一次放学
+        for i in range(lo, hi):
+            start = plan.starts[i]
+            if plan.kinds[i] == 'a':
+                events.append((start, 1, plan.lessons[i]))  # 上课
+                # 预备铃：提前 prepare_minutes 分钟，且届时处于本节点的课间
+                prepare = start - prepare_minutes * 60
+                if prepare_minutes and i > lo and plan.kinds[i - 1] == 'f' and plan.starts[i - 1] <= prepare:
+                    events.append((prepare, 3, plan.lessons[i]))
+                continue
+            next_lesson = next((plan.lessons[j] for j in range(i + 1, hi) if plan.kinds[j] == 'a'), None)
+            if next_lesson is not None:
+                events.append((start, 0, next_lesson))  # 下课
+            elif not after_school:
+                after_school = True
+                if plan.part_types[p] == 'break':  # 休息段
+                    events.append((start, 0, plan.part_names[p]))  # 下课
+                else:
+                    events.append((start, 2, ''))  # 放学
+        if not after_school and plan.kinds[hi - 1] == 'a' and plan.part_types[p] != 'break':
+            events.append((plan.part_ends[p], 2, ''))  # 最后一节课结束即放学
+    events.sort(key=lambda e: e[0])
+    return events
 
 
-# 获取倒计时、弹窗提示
-def get_countdown(toast=False):  # 重构好累aaaa
-    def after_school():  # 放学
-        if parts_type[part] == 'break':  # 休息段
-            notification.push_notification(0, current_lesson_name)  # 下课
-        else:
-            notification.push_notification(2)  # 放学
-
-    current_dt = dt.datetime.combine(today, dt.datetime.strptime(current_time, '%H:%M:%S').time())  # 当前时间
-    return_text = []
-    got_return_data = False
-
-    if parts_start_time:
-        c_time, part = get_part()
-
-        if current_dt >= c_time:
-            for item_name, item_time in timeline_data.items():
-                if item_name.startswith(f'a{str(part)}') or item_name.startswith(f'f{str(part)}'):
-                    # 判断时间是否上下课，发送通知
-                    if current_dt == c_time and toast:
-                        if item_name.startswith('a'):
-                            notification.push_notification(1, current_lesson_name)  # 上课
-                        else:
-                            if next_lessons:  # 下课/放学
-                                notification.push_notification(0, next_lessons[0])  # 下课
-                            else:
-                                after_school()
-
-                    if current_dt == c_time - dt.timedelta(minutes=int(conf.read_conf('Toast', 'prepare_minutes'))):
-                        if conf.read_conf('Toast', 'prepare_minutes') != '0' and toast and item_name.startswith('a'):
-                            if not current_state:  # 课间
-                                notification.push_notification(3, next_lessons[0])  # 准备上课（预备铃）
-
-                    # 放学
-                    if (c_time + dt.timedelta(minutes=int(item_time)) == current_dt and not next_lessons and
-                            not current_state and toast):
-                        after_school()
-
-                    add_time = int(item_time)
-                    c_time += dt.timedelta(minutes=add_time)
-
-                    if got_return_data:
-                        break
-
-                    if c_time >= current_dt:
-                        # 根据所在时间段使用不同标语
-                        if item_name.startswith('a'):
-                            return_text.append('当前活动结束还有')
-                        else:
-                            return_text.append('课间时长还有')
-                        # 返回倒计时、进度条
-                        time_diff = c_time - current_dt
-                        minute, sec = divmod(time_diff.seconds, 60)
-                        return_text.append(f'{minute:02d}:{sec:02d}')
-                        # 进度条
-                        seconds = time_diff.seconds
-                        return_text.append(int(100 - seconds / (int(item_time) * 60) * 100))
-                        got_return_data = True
-            if not return_text:
-                return_text = ['目前课程已结束', f'00:00', 100]
-        else:
-            if f'a{part}1' in timeline_data:
-                time_diff = c_time - current_dt
-                minute, sec = divmod(time_diff.seconds, 60)
-                return_text = ['距离上课还有', f'{minute:02d}:{sec:02d}', 100]
+class BellScheduler:  # 上下课提醒调度，在统一定时器中为下一个提醒登记单次任务，代替逐秒比对
+    max_delay = 60  # 最长等待（秒），时差偏移或系统时间被调整后也能及时校正
+    catch_up = 60  # 定时器迟到多久以内仍补发提醒（秒）
+
+    def __init__(self):
+        self.events = []
+        self.times = []
+        self.next_index = 0
+        self.settings = None  # 规划时的 (预备铃分钟数, 时差偏移)
+        self.job = None
+
+    @staticmethod
+    def now_seconds():  # 当前时间（当日秒数，含小数，已扣除时差偏移）
+        now = dt.datetime.now()
+        return (now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1e6
+                - conf.get_snapshot().time_offset)
+
+    def replan(self):  # 课程表、日期或提醒设置变化时重新规划
+        snapshot = conf.get_snapshot()
+        self.settings = (snapshot.prepare_minutes, snapshot.time_offset)
+        self.events = build_bell_events(day_plan, snapshot.prepare_minutes)
+        self.times = [e[0] for e in self.events]
+        self.next_index = bisect.bisect_right(self.times, self.now_seconds())  # 已过去的提醒不再补发
+        self.arm()
+
+    def on_settings_changed(self):
+        snapshot = conf.get_snapshot()
+        if (snapshot.prepare_minutes, snapshot.time_offset) != self.settings:
+            self.replan()
+
+    def arm(self):
+        timer_wheel.cancel(self.job)
+        self.job = None
+        if self.next_index >= len(self.events):  # 今日已无提醒，日期变化时重新规划
+            return
+        delay = self.times[self.next_index] - self.now_seconds()
+        self.job = timer_wheel.once(self.fire_due, min(max(delay, 0), self.max_delay), name='bell')
+
+    def fire_due(self):
+        t = self.now_seconds()
+        while self.next_index < len(self.events) and self.times[self.next_index] <= t + 0.05:
+            event_time, state, lesson_name = self.events[self.next_index]
+            self.next_index += 1
+            if t - event_time > self.catch_up:
+                logger.warning(f'提醒已过期 {int(t - event_time)} 秒，跳过（类型 {state}）')
+                continue
+            notification.push_notification(state, lesson_name)
+        self.arm()
+
+
+bell_scheduler = None
+
+
+class TimerJob:  # 统一定时器中的任务
+    __slots__ = ('callback', 'period', 'phase', 'repeat', 'due', 'priority', 'owner', 'throttle', 'name', 'active')
+
+    def __init__(self, callback, period, phase, repeat, priority, owner, throttle, name):
+        self.callback = callback
+        self.period = period  # 周期（秒），单次任务为延迟
+        self.phase = phase  # 对齐系统时间的相位（秒），None 表示从注册时开始计时
+        self.repeat = repeat
+        self.due = 0.0  # 下次执行时间（时间戳）
+        self.priority = priority  # 同一时刻按优先级（小者先）执行
+        self.owner = owner  # 所属窗口，销毁时自动取消
+        self.throttle = throttle  # 所属窗口隐藏时跳过
+        self.name = name or getattr(callback, '__qualname__', 'job')
+        self.active = True
+
+
+class TimerWheel(QObject):  # 统一定时调度：所有周期/单次任务共用一个定时器，每个到期时刻只唤醒一次
+    max_delay = 60 * 1000  # 最长等待（毫秒），系统时间被调回后也能及时校正
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.heap = []  # (执行时间, 优先级, 序号, 任务)
+        self.seq = 0
+        self.last_wake = time.time()
+        self.wakeups = 0  # 定时器唤醒次数
+        self.job_stats = {}  # 任务名 -> [执行次数, 总耗时, 最大耗时]（毫秒）
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self.on_timeout)
+
+    def add(self, callback, period, phase=None, owner=None, throttle=False, name=None, priority=1):  # 周期任务
+        job = TimerJob(callback, period, phase, True, priority, owner, throttle, name)
+        return self.schedule(job, time.time())
+
+    def once(self, callback, delay, owner=None, name=None):  # 单次任务
+        job = TimerJob(callback, delay, None, False, 1, owner, False, name)
+        return self.schedule(job, time.time())
+
+    def cancel(self, job):
+        if job is not None:
+            job.active = False
+
+    def schedule(self, job, now):
+        job.due = self.next_due(job, now)
+        if job.owner is not None:
+            job.owner.destroyed.connect(lambda: self.cancel(job))
+        self.push(job)
+        self.arm()
+        return job
+
+    @staticmethod
+    def next_due(job, now):
+        if job.phase is None:
+            return now + job.period
+        return (math.floor((now - job.phase) / job.period) + 1) * job.period + job.phase  # 对齐到下一个整周期
+
+    def push(self, job):
+        self.seq += 1
+        heapq.heappush(self.heap, (job.due, job.priority, self.seq, job))
+
+    def arm(self):
+        while self.heap and (not self.heap[0][3].active or self.heap[0][0] != self.heap[0][3].due):
+            heapq.heappop(self.heap)  # 丢弃已取消或已重新安排的条目
+        if not self.heap:
+            self.timer.stop()
+            return
+        delay = math.ceil((self.heap[0][0] - time.time()) * 1000)
+        self.timer.start(min(max(delay, 0), self.max_delay))
+
+    def realign(self, now):  # 系统时间被调回，重新计算全部任务的执行时间
+        jobs = [job for due, _, _, job in self.heap if job.active and due == job.due]
+        self.heap = []
+        for job in jobs:
+            job.due = min(job.due, now + job.period) if job.phase is None else self.next_due(job, now)
+            self.push(job)
+
+    def on_timeout(self):
+        now = time.time()
+        if now < self.last_wake - 1:
+            logger.warning('系统时间被调回，重新安排定时任务')
+            self.realign(now)
+        self.last_wake = now
+        self.wakeups += 1
+
+        due_jobs = []
+        while self.heap and self.heap[0][0] <= now:
+            due, _, _, job = heapq.heappop(self.heap)
+            if not job.active or due != job.due:
+                continue
+            if job.repeat:  # 错过的周期合并为一次
+                job.due = due + job.period if job.phase is None else self.next_due(job, now)
+                if job.due <= now:
+                    job.due = now + job.period
+                self.push(job)
+            else:
+                job.active = False
+            due_jobs.append(job)
+
+        for job in due_jobs:
+            if job.throttle and not job.owner.isVisible():  # 隐藏时跳过
+                continue
+            start = time.perf_counter()
+            try:
+                job.callback()
+            except Exception:
+                sys.excepthook(*sys.exc_info())
+            self.record(job.name, (time.perf_counter() - start) * 1000)
+        self.arm()
+
+    def record(self, name, elapsed):
+        stats = self.job_stats.get(name)
+        if stats is None:
+            stats = self.job_stats[name] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] = max(stats[2], elapsed)
+        if utils.tick_profiler.enabled:
+            utils.tick_profiler.record(f'timer:{name}', elapsed)
+
+    def summary(self):  # 单行统计文本：唤醒次数及各任务的执行次数、平均/最大耗时
+        jobs = '，'.join(f'{name} {count} 次 avg {total / count:.2f} / max {max_:.2f} ms'
+                        for name, (count, total, max_) in sorted(self.job_stats.items()))
+        return f'统一定时器唤醒 {self.wakeups} 次：{jobs or "无任务执行"}'
+
+
+timer_wheel = None
+
+
+class TickScheduler:  # 每秒刷新：在统一定时器中对齐系统时间整秒，统计迟到并补检错过的提醒
+    late_threshold = 500  # 迟到超过此值（毫秒）时输出统计
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.job = None
+        self.last_second = None  # 上次刷新所在的整秒
+        self.lateness = deque(maxlen=300)  # 最近的迟到时间（毫秒）
+        self.ticks = 0
+        self.missed_ticks = 0  # 因迟到而合并的秒数
+        utils.tick_profiler.reporters.append(self.summary)
+
+    def start(self):  # 立即刷新一次并开始调度（重复调用不会重复注册）
+        if self.job is None:
+            self.job = timer_wheel.add(self.on_timeout, 1, phase=0, name='tick', priority=0)
+        self.run(time.time())
+
+    def on_timeout(self):
+        now = time.time()
+        target = self.last_second + 1 if self.last_second is not None else math.floor(now)
+        lateness = max(now - target, 0) * 1000
+        self.lateness.append(lateness)
+        if utils.tick_profiler.enabled:
+            utils.tick_profiler.record('lateness', lateness)
+
+        missed = int(now) - target
+        if missed > 0:  # 错过的秒不再逐一刷新，先补检提醒再合并为一次刷新
+            self.missed_ticks += missed
+            if bell_scheduler is not None:
+                bell_scheduler.fire_due()
+        if lateness > self.late_threshold:
+            logger.warning(f'刷新迟到 {lateness:.0f} ms，合并了 {max(missed, 0)} 秒的刷新（{self.summary()}）')
+        self.run(now)
+
+    def run(self, now):
+        self.last_second = int(now)
+        self.ticks += 1
+        self.callback()
+
+    def stats(self):  # 迟到统计（毫秒），供诊断使用
+        values = sorted(self.lateness)
+        if not values:
+            return {'ticks': self.ticks, 'missed_ticks': self.missed_ticks}
+        return {
+            'ticks': self.ticks,
+            'missed_ticks': self.missed_ticks,
+            'p50': utils.percentile(values, 0.5),
+            'p95': utils.percentile(values, 0.95),
+            'p99': utils.percentile(values, 0.99),
+            'max': values[-1]
+        }
+
+    def summary(self):  # 单行统计文本
+        stats = self.stats()
+        text = f'每秒刷新 {stats["ticks"]} 次，合并 {stats["missed_ticks"]} 秒'
+        if 'max' in stats:
+            text += (f'，迟到 p50 {stats["p50"]:.1f} / p95 {stats["p95"]:.1f} / p99 {stats["p99"]:.1f}'
+                     f' / max {stats["max"]:.1f} ms')
+        return text
+
+
+tick_scheduler = None
+
+
+# 获取倒计时
+def get_countdown():  # 重构好累aaaa
+    if not day_plan.part_keys:
+        return None
+    t = get_current_seconds()
+    p = day_plan.find_part(t)
+    lo, hi = day_plan.part_ranges[p]
+    part_start = day_plan.part_starts[p]
+
+    if t >= part_start:
+        i = bisect.bisect_left(day_plan.ends, t, lo, hi)  # 第一个未结束的活动
+        if i < hi:
+            # 根据所在时间段使用不同标语
+            if day_plan.kinds[i] == 'a':
+                title = '当前活动结束还有'
             else:
-                return_text = ['目前课程已结束', f'00:00', 100]
-        return return_text
+                title = '课间时长还有'
+            # 返回倒计时、进度条
+            seconds = day_plan.ends[i] - t
+            minute, sec = divmod(seconds, 60)
+            duration = day_plan.ends[i] - day_plan.starts[i]
+            progress = int(100 - seconds / duration * 100) if duration else 100
+            return [title, f'{minute:02d}:{sec:02d}', progress]
+        return ['目前课程已结束', f'00:00', 100]
+    else:
+        if day_plan.part_has_lesson[p]:
+            minute, sec = divmod(part_start - t, 60)
+            return ['距离上课还有', f'{minute:02d}:{sec:02d}', 100]
+        return ['目前课程已结束', f'00:00', 100]
 
 
 # 获取将发生的活动
 def get_next_lessons():
-    global current_lesson_name
     global next_lessons
     next_lessons = []
-    part = 0
-    current_dt = dt.datetime.combine(today, dt.datetime.strptime(current_time, '%H:%M:%S').time())  # 当前时间
-
-    if parts_start_time:
-        c_time, part = get_part()
-
-        def before_class():
-            if part == 0:
-                return True
-            else:
-                if current_dt >= parts_start_time[part] - dt.timedelta(minutes=60):
-                    return True
-                else:
-                    return False
+    t = get_current_seconds()
+    p = day_plan.find_part(t)
+    if p is None:
+        return
 
-        if before_class():
-            for item_name, item_time in timeline_data.items():
-                if item_name.startswith(f'a{str(part)}') or item_name.startswith(f'f{str(part)}'):
-                    add_time = int(item_time)
-                    if c_time > current_dt and item_name.startswith('a'):
-                        next_lessons.append(current_lessons[item_name])
-                    c_time += dt.timedelta(minutes=add_time)
+    # 第一个节点，或距节点开始不足60分钟
+    if day_plan.part_keys[p] == 0 or t >= day_plan.part_starts[p] - 60 * 60:
+        lo, hi = day_plan.part_ranges[p]
+        i = bisect.bisect_right(day_plan.starts, t, lo, hi)  # 第一个未开始的活动
+        next_lessons = [day_plan.lessons[j] for j in range(i, hi) if day_plan.kinds[j] == 'a']
 
 
 def get_next_lessons_text():
@@ -376,30 +663,81 @@ def get_next_lessons_text():
 # 获取当前活动
 def get_current_lesson_name():
     global current_lesson_name, current_state
-    current_dt = dt.datetime.combine(today, dt.datetime.strptime(current_time, '%H:%M:%S').time())  # 当前时间
     current_lesson_name = '暂无课程'
     current_state = 0
+    t = get_current_seconds()
+    p = day_plan.find_part(t)
+    if p is None or t < day_plan.part_starts[p]:
+        return
 
-    if parts_start_time:
-        c_time, part = get_part()
+    if day_plan.part_types[p] == 'break':  # 休息段
+        current_lesson_name = day_plan.part_names[p]
+        current_state = 2
 
-        if current_dt >= c_time:
-            if parts_type[part] == 'break':  # 休息段
-                current_lesson_name = loaded_data['part_name'][str(part)]
-                current_state = 2
+    lo, hi = day_plan.part_ranges[p]
+    i = bisect.bisect_right(day_plan.ends, t, lo, hi)  # 正在进行的活动
+    if i < hi:
+        if day_plan.kinds[i] == 'a':
+            current_lesson_name = day_plan.lessons[i]
+            current_state = 1
+        else:
+            current_lesson_name = '课间'
+            current_state = 0
+
+
+class TickState:  # 每次刷新只计算一次的状态，供所有小组件、浮窗与插件共享
+    __slots__ = (
+        'now', 'today', 'week', 'lesson_name', 'state', 'countdown', 'progress', 'next_lessons',
+        'next_lessons_text', 'part', 'week_type', 'custom_countdown',
+    )
+
+    def __init__(self, now):
+        self.now = now
+        self.today = today
+        self.week = current_week
+        self.lesson_name = current_lesson_name
+        self.state = current_state
+        self.countdown = get_countdown()  # [标题, 倒计时, 进度] 或 None
+        self.progress = self.countdown[2] if self.countdown else 0
+        self.next_lessons = tuple(next_lessons)
+        self.next_lessons_text = get_next_lessons_text()
+        self.part = get_part()
+        self.week_type = conf.get_week_type()
+        self.custom_countdown = conf.get_custom_countdown()
+
+
+tick_state = None
+
+
+def update_tick_state():  # 每次刷新（每秒）计算一次
+    global current_time, current_seconds, current_week, filename, time_offset, today, tick_state
+
+    snapshot = conf.get_snapshot()
+    now = dt.datetime.now()
+    today = now.date()
+    current_time = now.strftime('%H:%M:%S')
+    current_seconds = now.hour * 3600 + now.minute * 60 + now.second
+    filename = snapshot.schedule
+    time_offset = snapshot.time_offset
+
+    if snapshot.set_week is not None:  # 调休日
+        current_week = snapshot.set_week
+    else:
+        current_week = now.weekday()
+
+    get_start_time()
+    get_current_lessons()
+    get_current_lesson_name()
+    get_next_lessons()
+
+    tick_state = TickState(now)
+    return tick_state
 
-            for item_name, item_time in timeline_data.items():
-                if item_name.startswith(f'a{str(part)}') or item_name.startswith(f'f{str(part)}'):
-                    add_time = int(item_time)
-                    c_time += dt.timedelta(minutes=add_time)
-                    if c_time > current_dt:
-                        if item_name.startswith('a'):
-                            current_lesson_name = current_lessons[item_name]
-                            current_state = 1
-                        else:
-                            current_lesson_name = '课间'
-                            current_state = 0
-                        return
+
+def get_tick_state():  # 本次刷新的状态（尚未计算时立即计算）
+    if tick_state is None:
+        return update_tick_state()
+    return tick_state
 
 
 # 定义 RECT 结构体
@@ -542,25 +880,30 @@ class ErrorDialog(Dialog):  # 重大错误提示框
 class PluginManager:  # 插件管理器
     def __init__(self):
         self.cw_contexts = {}
+        self.contexts_state = None  # 生成 cw_contexts 时的 TickState
         self.get_app_contexts()
         self.temp_window = []
         self.method = PluginMethod(self.cw_contexts)
 
     def get_app_contexts(self, path=None):
+        state = get_tick_state()
+        if path is None and state is self.contexts_state:  # 同一次刷新内的插件共用
+            return self.cw_contexts
+        self.contexts_state = state if path is None else None
         self.cw_contexts = {
             "Widgets_Width": list.widget_width,
             "Widgets_Name": list.widget_name,
             "Widgets_Code": list.widget_conf,  # 小组件列表
 
-            "Current_Lesson": current_lesson_name,  # 当前课程名
-            "State": current_state,  # 0：课间 1：上课（上下课状态）
-            "Current_Part": get_part(),  # 返回开始时间、Part序号
-            "Next_Lessons_text": get_next_lessons_text(),  # 下节课程
+            "Current_Lesson": state.lesson_name,  # 当前课程名
+            "State": state.state,  # 0：课间 1：上课（上下课状态）
+            "Current_Part": state.part,  # 返回开始时间、Part序号
+            "Next_Lessons_text": state.next_lessons_text,  # 下节课程
 
             "Weather": weather_name,  # 天气情况
             "Temp": temperature,  # 温度
             "Weather_Data": weather_data_temp,  # 天气数据
-            "Weather_API": conf.read_conf('Weather', 'api'),  # 天气API
+            "Weather_API": conf.get_snapshot().weather_api,  # 天气API
             "Notification": notification.notification_contents,  # 检测到的通知内容
 
             "PLUGIN_PATH": f'{conf.PLUGINS_DIR}/{path}',  # 传递插件目录
@@ -581,6 +924,7 @@ class PluginMethod:  # 插件方法
 
     def adjust_widget_width(self, widget_code, width):  # 调整小组件宽度
         self.app_contexts['Widgets_Width'][widget_code] = width
+        mgr.invalidate_layout()
 
     @staticmethod
     def get_widget(widget_code):  # 获取小组件实例
@@ -667,6 +1011,23 @@ class PluginMethod:  # 插件方法
         play_audio(file_path, tts_delete_after)
 
 
+class WidgetLayout:  # 小组件布局（按前缀和计算各小组件位置）
+    __slots__ = ('margin', 'height', 'total_width', 'start_x', 'positions', 'widths')
+
+    def __init__(self, widgets_list, widths, spacing, height, margin, screen_width):
+        self.margin = margin
+        self.height = height
+        self.total_width = sum(widths) + spacing * (len(widths) - 1)
+        self.start_x = (screen_width - self.total_width) // 2
+        self.positions = {}  # 小组件 -> 横坐标
+        self.widths = {}
+        offset = self.start_x
+        for path, width in zip(widgets_list, widths):
+            self.positions.setdefault(path, int(offset))
+            self.widths.setdefault(path, width)
+            offset += width + spacing
+
+
 class WidgetsManager:
     def __init__(self):
         self.widgets = []  # 小组件实例
@@ -678,11 +1039,17 @@ class WidgetsManager:
 
         self.start_pos_x = 0  # 小组件起始位置
         self.start_pos_y = 0
+        self.layout = None  # 屏幕可用区域、小组件宽度变化时重新计算
+
+        # 自动隐藏状态机
+        self.auto_hidden = None  # 自动隐藏当前生效的状态（None：未启用）
+        self.pending_hidden = None  # 等待生效的状态
+        self.pending_ticks = 0  # 等待状态已连续保持的刷新次数
 
     def init_widgets(self):  # 初始化小组件
         self.widgets_list = list.get_widget_config()
         self.check_widgets_exist()
-        self.spacing = conf.load_theme_config(theme)['spacing']
+        self.spacing = conf.theme_registry.get(theme).spacing
 
         self.get_start_pos()
 
@@ -701,64 +1068,62 @@ class WidgetsManager:
     @staticmethod
     def get_widget_width(path):
         try:
-            width = conf.load_theme_width(theme)[path]
+            width = conf.theme_registry.get(theme).widget_width[path]
         except KeyError:
             width = list.widget_width[path]
         return int(width)
 
     @staticmethod
     def get_widgets_height():
-        return int(conf.load_theme_config(theme)['height'])
+        return conf.theme_registry.get(theme).height
 
     def create_widgets(self):
         for widget in self.widgets:
             widget.show()
             logger.info(f'显示小组件：{widget.path, widget.windowTitle()}')
 
-    def adjust_ui(self):  # 更新小组件UI
+    def adjust_ui(self):  # 更新小组件UI（布局未变化时不做任何操作）
+        layout = self.get_layout()
+        op = conf.get_snapshot().opacity
         for widget in self.widgets:
             # 调整窗口尺寸
-            width = self.get_widget_width(widget.path)
-            height = self.get_widgets_height()
-            pos_x = self.get_widget_pos(widget.path)[0]
-            op = int(conf.read_conf('General', 'opacity')) / 100
-
-            if widget.animation is None:
-                widget.widget_transition(pos_x, width, height, op)
+            target = (layout.positions[widget.path], layout.widths[widget.path], layout.height, op)
+            if widget.animation is None and widget.layout_target != target:
+                widget.layout_target = target
+                widget.widget_transition(*target)
+
+    def invalidate_layout(self):  # 屏幕可用区域、小组件宽度变化
+        self.layout = None
+
+    def get_layout(self):
+        margin = conf.get_snapshot().margin
+        if self.layout is None or self.layout.margin != margin:
+            self.layout = self.calculate_layout(margin)
+            self.widgets_width = self.layout.total_width
+            self.start_pos_x = self.layout.start_x
+            self.start_pos_y = margin
+        return self.layout
+
+    def calculate_layout(self, margin):  # 计算小组件布局
+        widths = []
+        for widget in self.widgets_list:
+            try:
+                widths.append(self.get_widget_width(widget))
+            except Exception as e:
+                logger.warning(f'计算小组件宽度发生错误：{e}')
+                widths.append(0)
+        screen_width = app.primaryScreen().availableGeometry().width()
+        return WidgetLayout(self.widgets_list, widths, self.spacing, self.get_widgets_height(), margin, screen_width)
 
     def get_widget_pos(self, path):  # 获取小组件位置
-        num = self.widgets_list.index(path)
-        self.get_start_pos()
-        pos_x = self.start_pos_x + self.spacing * num
-        for i in range(num):
-            try:
-                pos_x += conf.load_theme_width(theme)[self.widgets_list[i]]
-            except KeyError:
-                pos_x += list.widget_width[self.widgets_list[i]]
-            except:
-                pos_x += 0
-        return [int(pos_x), int(self.start_pos_y)]
+        layout = self.get_layout()
+        return [layout.positions[path], int(layout.margin)]
 
     def get_start_pos(self):
-        self.calculate_widgets_width()
-        screen_geometry = app.primaryScreen().availableGeometry()
-        screen_width = screen_geometry.width()
-        screen_height = screen_geometry.height()
-
-        self.start_pos_y = int(conf.read_conf('General', 'margin'))
-        self.start_pos_x = (screen_width - self.widgets_width) // 2
+        self.get_layout()
 
     def calculate_widgets_width(self):  # 计算小组件占用宽度
-        self.widgets_width = 0
-        # 累加小组件宽度
-        for widget in self.widgets_list:
-            try:
-                self.widgets_width += self.get_widget_width(widget)
-            except Exception as e:
-                logger.warning(f'计算小组件宽度发生错误：{e}')
-                self.widgets_width += 0
-
-        self.widgets_width += self.spacing * (len(self.widgets_list) - 1)
+        self.widgets_width = self.get_layout().total_width
 
     # def add_widget(self, widget):
     #     self.widgets.append(widget)
@@ -775,12 +1140,13 @@ class WidgetsManager:
 
     def show_windows(self):
         if fw.animating:  # 避免动画Bug
-            return
+            return False
         if fw.isVisible():
             fw.close()
         self.state = 1
         for widget in self.widgets:
             widget.animate_show()
+        return True
 
     def clear_widgets(self):
         if fw.isVisible():
@@ -792,30 +1158,67 @@ class WidgetsManager:
         init()
 
     def update_widgets(self):
-        c = 0
-        self.adjust_ui()
+        profiler = utils.tick_profiler
+        with profiler.measure('schedule'):
+            state = update_tick_state()  # 所有小组件与插件共用本次计算结果
+        self.update_visibility(state)
+        with profiler.measure('adjust_ui'):
+            self.adjust_ui()
 
         for widget in self.widgets:
-            if c == 0:
-                get_countdown(True)
-            widget.update_data(path=widget.path)
-            c += 1
-        p_loader.update_plugins()
+            with profiler.measure(f'widget:{widget.path}'):
+                widget.update_data(path=widget.path)
+            if profiler.enabled:  # 统计时立即重绘以测量绘制耗时
+                with profiler.measure(f'paint:{widget.path}'):
+                    widget.repaint()
+        with profiler.measure('plugins'):
+            p_loader.update_plugins()
 
         if notification.pushed_notification:
             notification.pushed_notification = False
 
     def decide_to_hide(self):
-        if conf.read_conf('General', 'hide_method') == '0':  # 正常
+        hide_method = conf.get_snapshot().hide_method
+        if hide_method == 0:  # 正常
             self.hide_windows()
-        elif conf.read_conf('General', 'hide_method') == '1':  # 单击即完全隐藏
+        elif hide_method == 1:  # 单击即完全隐藏
             self.full_hide_windows()
-        elif conf.read_conf('General', 'hide_method') == '2':  # 最小化为浮窗
-            if not fw.animating:
-                self.full_hide_windows()
-                fw.show()
+        elif hide_method == 2:  # 最小化为浮窗
+            if fw.animating:
+                return False
+            self.full_hide_windows()
+            fw.show()
         else:
             self.hide_windows()
+        return True
+
+    def update_visibility(self, state):  # 自动隐藏：每次刷新判断一次，仅在状态切换时播放动画
+        hide = conf.get_snapshot().hide
+        if hide == conf.HideMode.IN_CLASS:  # 上课自动隐藏
+            should_hide = bool(state.state)
+            delay = 1
+        elif hide == conf.HideMode.MAXIMIZED:  # 最大化/全屏自动隐藏
+            should_hide = bool(check_windows_maximize() or check_fullscreen())
+            delay = 2  # 切换窗口时检测结果可能短暂变化，需连续保持才切换
+        else:
+            self.auto_hidden = self.pending_hidden = None
+            return
+
+        if should_hide != self.pending_hidden:
+            self.pending_hidden = should_hide
+            self.pending_ticks = 0
+        self.pending_ticks += 1
+
+        if self.auto_hidden is None:  # 刚启用自动隐藏，以当前显示状态为准
+            self.auto_hidden = self.state == 0
+        if should_hide == self.auto_hidden or self.pending_ticks < delay:
+            return
+        if should_hide:
+            applied = self.decide_to_hide()
+        else:
+            applied = self.show_windows()
+        if applied:  # 浮窗动画中未能切换时，下次刷新重试
+            self.auto_hidden = should_hide
 
 
 class openProgressDialog(QWidget):
@@ -836,13 +1239,8 @@ class openProgressDialog(QWidget):
 
         self.opening_countdown = self.findChild(ProgressRing, 'opening_countdown')
         self.opening_countdown.setRange(0, time - 1)
-        self.progress_timer = QTimer(self)
-        self.progress_timer.timeout.connect(self.update_progress)
-        self.progress_timer.start(1000)
-
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.execute_action)
-        self.timer.start(time * 1000)
+        self.progress_job = timer_wheel.add(self.update_progress, 1, owner=self, name='open_progress')
+        self.action_job = timer_wheel.once(self.execute_action, time, owner=self, name='open_action')
 
         self.cancel_opening = self.findChild(QPushButton, 'cancel_opening')
         self.cancel_opening.clicked.connect(self.cancel_action)
@@ -853,14 +1251,18 @@ class openProgressDialog(QWidget):
         self.opening_countdown.setValue(self.opening_countdown.value() + 1)
 
     def execute_action(self):
-        self.timer.stop()
+        self.stop_jobs()
         subprocess.Popen(self.action)
         self.close()
 
     def cancel_action(self):
-        self.timer.stop()
+        self.stop_jobs()
         self.close()
 
+    def stop_jobs(self):
+        timer_wheel.cancel(self.progress_job)
+        timer_wheel.cancel(self.action_job)
+
     def init_ui(self):
         self.setWindowFlags(
             Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint |
@@ -869,9 +1271,9 @@ class openProgressDialog(QWidget):
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
 
         if isDarkTheme():
-            uic.loadUi(f'{base_directory}/ui/default/dark/toast-open_dialog.ui', self)
+            utils.load_ui(f'{base_directory}/ui/default/dark/toast-open_dialog.ui', self)
         else:
-            uic.loadUi(f'{base_directory}/ui/default/toast-open_dialog.ui', self)
+            utils.load_ui(f'{base_directory}/ui/default/toast-open_dialog.ui', self)
 
         backgnd = self.findChild(QFrame, 'backgnd')
         shadow_effect = QGraphicsDropShadowEffect(self)
@@ -935,6 +1337,7 @@ class FloatingWidget(QWidget):  # 浮窗
         self.animating = False
         self.focusing = False
         self.text_changed = False
+        self.view = utils.ViewModel()
 
         self.current_lesson_name_text = self.findChild(QLabel, 'subject')
         self.activity_countdown = self.findChild(QLabel, 'activity_countdown')
@@ -943,22 +1346,21 @@ class FloatingWidget(QWidget):  # 浮窗
         self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)  # 检查焦点
 
         self.update_data()
-        timer = QTimer(self)
-        timer.timeout.connect(self.update_data)
-        timer.start(1000)
+        # 与每秒刷新同时执行（在其之后），隐藏时跳过
+        self.update_job = timer_wheel.add(self.update_data, 1, phase=0, owner=self, throttle=True, name='floating')
 
     def init_ui(self):
         setTheme_()
         if os.path.exists(f'{base_directory}/ui/{theme}/widget-floating.ui'):
-            if isDarkTheme() and conf.load_theme_config(theme)['support_dark_mode']:
-                uic.loadUi(f'{base_directory}/ui/{theme}/dark/widget-floating.ui', self)
+            if isDarkTheme() and conf.theme_registry.get(theme).support_dark_mode:
+                utils.load_ui(f'{base_directory}/ui/{theme}/dark/widget-floating.ui', self)
             else:
-                uic.loadUi(f'{base_directory}/ui/{theme}/widget-floating.ui', self)
+                utils.load_ui(f'{base_directory}/ui/{theme}/widget-floating.ui', self)
         else:
-            if isDarkTheme() and conf.load_theme_config(theme)['support_dark_mode']:
-                uic.loadUi(f'{base_directory}/ui/default/dark/widget-floating.ui', self)
+            if isDarkTheme() and conf.theme_registry.get(theme).support_dark_mode:
+                utils.load_ui(f'{base_directory}/ui/default/dark/widget-floating.ui', self)
             else:
-                uic.loadUi(f'{base_directory}/ui/default/widget-floating.ui', self)
+                utils.load_ui(f'{base_directory}/ui/default/widget-floating.ui', self)
 
         # 设置窗口无边框和透明背景
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
@@ -996,25 +1398,23 @@ class FloatingWidget(QWidget):  # 浮窗
                 """)
 
     def update_data(self):
-        self.setWindowOpacity(int(conf.read_conf('General', 'opacity')) / 100)  # 设置窗口透明度
-        cd_list = get_countdown()
-        self.text_changed = False
-        if self.current_lesson_name_text.text() != current_lesson_name:
-            self.text_changed = True
-
-        self.current_lesson_name_text.setText(current_lesson_name)
+        if not self.animating:  # 避免覆盖显示/隐藏动画中的透明度
+            self.view.set_window_opacity(self, conf.get_snapshot().opacity)  # 设置窗口透明度
+        state = get_tick_state()
+        cd_list = state.countdown
+        self.text_changed = self.view.changed(self.current_lesson_name_text, 'text', state.lesson_name)
+        if self.text_changed:
+            self.current_lesson_name_text.setText(state.lesson_name)
 
         if cd_list:  # 模糊倒计时
             if cd_list[1] == '00:00':
-                self.activity_countdown.setText(f"< - 分钟")
+                self.view.set_text(self.activity_countdown, f"< - 分钟")
             else:
-                self.activity_countdown.setText(f"< {int(cd_list[1].split(':')[0]) + 1} 分钟")
-            self.countdown_progress_bar.setValue(cd_list[2])
+                self.view.set_text(self.activity_countdown, f"< {int(cd_list[1].split(':')[0]) + 1} 分钟")
+            self.view.set_value(self.countdown_progress_bar, cd_list[2])
 
         self.adjustSize_animation()
 
-        self.update()
-
     def showEvent(self, event):  # 窗口显示
         logger.info('显示浮窗')
         self.move((screen_width - self.width()) // 2, 50)
@@ -1023,7 +1423,7 @@ class FloatingWidget(QWidget):  # 浮窗
         self.animation = QPropertyAnimation(self, b'windowOpacity')  # 透明度
         self.animation.setDuration(400)
         self.animation.setStartValue(0)
-        self.animation.setEndValue(int(conf.read_conf('General', 'opacity')) / 100)
+        self.animation.setEndValue(conf.get_snapshot().opacity)
         self.animation.setEasingCurve(QEasingCurve.Type.InOutCirc)
 
         self.animation_rect = QPropertyAnimation(self, b'geometry')  # 位置
@@ -1040,6 +1440,7 @@ class FloatingWidget(QWidget):  # 浮窗
 
     def animation_done(self):
         self.animating = False
+        self.view.invalidate(self, 'windowOpacity')  # 透明度已被动画修改，下次刷新时重新设置
 
     def closeEvent(self, event):
         event.ignore()
@@ -1066,6 +1467,7 @@ class FloatingWidget(QWidget):  # 浮窗
         event.accept()
         logger.info('隐藏浮窗')
         self.animating = False
+        self.view.invalidate(self, 'windowOpacity')
         self.setMinimumSize(QSize(self.width(), self.height()))
 
     def adjustSize_animation(self):
@@ -1104,7 +1506,7 @@ class FloatingWidget(QWidget):  # 浮窗
             hasattr(self, "p_Position")
             and self.r_Position == self.p_Position
             and not self.animating
-            and conf.read_conf("General", "hide") == "0"
+            and conf.get_snapshot().hide == conf.HideMode.NONE
         ):  # 开启自动隐藏忽略点击事件
             mgr.show_windows()
             self.close()
@@ -1120,14 +1522,13 @@ class DesktopWidget(QWidget):  # 主要小组件
     def __init__(self, parent=WidgetsManager, path='widget-time.ui', enable_tray=False):
         super().__init__()
         self.tray_menu = None
+        self.view = utils.ViewModel()
+        self.layout_target = None  # 上次应用的 (横坐标, 宽度, 高度, 透明度)
 
-        self.last_widgets = list.get_widget_config()
         self.path = path
 
-        self.last_code = 101010100
-        self.radius = conf.load_theme_config(theme)['radius']
-        self.last_theme = conf.read_conf('General', 'theme')
-        self.last_color_mode = conf.read_conf('General', 'color_mode')
+        theme_config = conf.theme_registry.get(theme)
+        self.radius = theme_config.radius
         self.w = 100
 
         self.position = parent.get_widget_pos(self.path)
@@ -1135,10 +1536,10 @@ class DesktopWidget(QWidget):  # 主要小组件
         self.opacity_animation = None
 
         try:
-            self.w = conf.load_theme_config(theme)['widget_width'][self.path]
+            self.w = theme_config.widget_width[self.path]
         except KeyError:
             self.w = list.widget_width[self.path]
-        self.h = conf.load_theme_config(theme)['height']
+        self.h = theme_config.height
 
         init_config()
         self.init_ui(path)
@@ -1172,13 +1573,10 @@ class DesktopWidget(QWidget):  # 主要小组件
             self.blur_effect_label = self.findChild(QLabel, 'blurEffect')
             # 模糊效果
             self.blur_effect = QGraphicsBlurEffect()
+            self.blur_effect.setBlurRadius(25)  # 模糊半径
+            self.blur_effect_label.setGraphicsEffect(self.blur_effect)
             self.current_subject.mouseReleaseEvent = self.rightReleaseEvent
 
-            self.d_t_timer = QTimer(self)
-            self.d_t_timer.setInterval(1000)
-            self.d_t_timer.timeout.connect(self.detect_theme_changed)
-            self.d_t_timer.start()
-
         elif path == 'widget-next-activity.ui':  # 接下来的活动
             self.nl_text = self.findChild(QLabel, 'next_lesson_text')
 
@@ -1195,15 +1593,15 @@ class DesktopWidget(QWidget):  # 主要小组件
             self.alert_icon.setFixedSize(24, 24)
             contentLayout.insertWidget(0, self.alert_icon)
 
+            snapshot = conf.get_snapshot()
+            cached = db.weather_cache.get(snapshot.weather_api, snapshot.weather_city, snapshot.weather_cache_max_age)
+            if cached is not None:  # 先显示缓存的天气，同时在后台刷新
+                self.update_weather_data(cached.data)
             self.get_weather_data()
-            self.weather_timer = QTimer(self)
-            self.weather_timer.setInterval(30 * 60 * 1000)  # 30分钟更新一次
-            self.weather_timer.timeout.connect(self.get_weather_data)
-            self.weather_timer.start()
-            self.w_d_timer = QTimer(self)
-            self.w_d_timer.setInterval(1000)  # 1s 检测一次
-            self.w_d_timer.timeout.connect(self.detect_weather_code_changed)
-            self.w_d_timer.start()
+            self.weather_job = timer_wheel.add(  # 30分钟更新一次
+                lambda: self.get_weather_data(refresh=True), 30 * 60, owner=self, name='weather'
+            )
+            utils.config_watcher.weatherCityChanged.connect(self.on_weather_city_changed)
 
         if hasattr(self, 'img'):  # 自定义图片主题兼容
             img = self.findChild(QLabel, 'img')
@@ -1216,7 +1614,7 @@ class DesktopWidget(QWidget):  # 主要小组件
         # 设置窗口位置
         if first_start:
             self.animate_window(self.position)
-            self.setWindowOpacity(int(conf.read_conf('General', 'opacity')) / 100)
+            self.setWindowOpacity(conf.get_snapshot().opacity)
         else:
             self.setWindowOpacity(0)
             self.animate_show_opacity()
@@ -1243,22 +1641,22 @@ class DesktopWidget(QWidget):  # 主要小组件
             logger.error(f"更新插件小组件时出错：{e}")
 
     def init_ui(self, path):
-        if conf.load_theme_config(theme)['support_dark_mode']:
+        if conf.theme_registry.get(theme).support_dark_mode:
             if os.path.exists(f'{base_directory}/ui/{theme}/{path}'):
                 if isDarkTheme():
-                    uic.loadUi(f'{base_directory}/ui/{theme}/dark/{path}', self)
+                    utils.load_ui(f'{base_directory}/ui/{theme}/dark/{path}', self)
                 else:
-                    uic.loadUi(f'{base_directory}/ui/{theme}/{path}', self)
+                    utils.load_ui(f'{base_directory}/ui/{theme}/{path}', self)
             else:
                 if isDarkTheme():
-                    uic.loadUi(f'{base_directory}/ui/{theme}/dark/widget-base.ui', self)
+                    utils.load_ui(f'{base_directory}/ui/{theme}/dark/widget-base.ui', self)
                 else:
-                    uic.loadUi(f'{base_directory}/ui/{theme}/widget-base.ui', self)
+                    utils.load_ui(f'{base_directory}/ui/{theme}/widget-base.ui', self)
         else:
             if os.path.exists(f'{base_directory}/ui/{theme}/{path}'):
-                uic.loadUi(f'{base_directory}/ui/{theme}/{path}', self)
+                utils.load_ui(f'{base_directory}/ui/{theme}/{path}', self)
             else:
-                uic.loadUi(f'{base_directory}/ui/{theme}/widget-base.ui', self)
+                utils.load_ui(f'{base_directory}/ui/{theme}/widget-base.ui', self)
 
         # 设置窗口无边框和透明背景
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
@@ -1291,7 +1689,7 @@ class DesktopWidget(QWidget):  # 主要小组件
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
 
         # 添加阴影效果
-        if conf.load_theme_config(theme)['shadow']:  # 修改阴影问题
+        if conf.theme_registry.get(theme).shadow:  # 修改阴影问题
             shadow_effect = QGraphicsDropShadowEffect(self)
             shadow_effect.setBlurRadius(28)
             shadow_effect.setXOffset(0)
@@ -1350,111 +1748,62 @@ class DesktopWidget(QWidget):  # 主要小组件
             self.open_exact_menu()
 
     def update_data(self, path=''):
-        global current_time, current_week, filename, start_y, time_offset, today
-
-        today = dt.date.today()
-        current_time = dt.datetime.now().strftime('%H:%M:%S')
-        filename = conf.read_conf('General', 'schedule')
-        time_offset = conf.get_time_offset()
-        filename = conf.read_conf('General', 'schedule')
-
-        if conf.read_conf('General', 'hide') == '1':  # 上课自动隐藏
-            if current_state:
-                mgr.decide_to_hide()
-            else:
-                mgr.show_windows()
-        elif conf.read_conf('General', 'hide') == '2':  # 最大化/全屏自动隐藏
-            if check_windows_maximize() or check_fullscreen():
-                mgr.decide_to_hide()
-            else:
-                mgr.show_windows()
-
-        if conf.is_temp_week():  # 调休日
-            current_week = conf.read_conf('Temp', 'set_week')
-        else:
-            current_week = dt.datetime.now().weekday()
-
-        get_start_time()
-        get_current_lessons()
-        get_current_lesson_name()
-        get_next_lessons()
-
-        cd_list = get_countdown()
+        snapshot = conf.get_snapshot()
+        state = get_tick_state()
+        cd_list = state.countdown
 
         if path == 'widget-time.ui':  # 日期显示
-            self.date_text.setText(f'{today.year} 年 {today.month} 月')
-            self.day_text.setText(f'{today.day} 日 {list.week[today.weekday()]}')
+            self.view.set_text(self.date_text, f'{today.year} 年 {today.month} 月')
+            self.view.set_text(self.day_text, f'{today.day} 日 {list.week[today.weekday()]}')
 
         if path == 'widget-current-activity.ui':  # 当前活动
-            self.current_subject.setText(f'  {current_lesson_name}')
-
-            if current_state != 2:  # 非休息段
-                render = QSvgRenderer(list.get_subject_icon(current_lesson_name))
-                self.blur_effect_label.setStyleSheet(
-                    f'background-color: rgba{list.subject_color(current_lesson_name)}, 200);'
-                )
-            else:  # 休息段
-                render = QSvgRenderer(list.get_subject_icon('课间'))
-                self.blur_effect_label.setStyleSheet(
-                    f'background-color: rgba{list.subject_color("课间")}, 200);'
-                )
-            pixmap = QPixmap(render.defaultSize())
-            pixmap.fill(Qt.GlobalColor.transparent)
-
-            painter = QPainter(pixmap)
-            render.render(painter)
-            if (isDarkTheme() and conf.load_theme_config(theme)['support_dark_mode']
-                    or isDarkTheme() and conf.load_theme_config(theme)['default_theme'] == 'dark'):  # 在暗色模式显示亮色图标
-                painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceIn)
-                painter.fillRect(pixmap.rect(), QColor("#FFFFFF"))
-            painter.end()
-
-            self.current_subject.setIcon(QIcon(pixmap))
-            self.blur_effect.setBlurRadius(25)  # 模糊半径
-            self.blur_effect_label.setGraphicsEffect(self.blur_effect)
+            self.view.set_text(self.current_subject, f'  {state.lesson_name}')
+
+            subject_name = state.lesson_name if state.state != 2 else '课间'  # 休息段
+            self.view.set_style_sheet(
+                self.blur_effect_label, f'background-color: rgba{list.subject_color(subject_name)}, 200);'
+            )
+            self.view.set_icon(
+                self.current_subject, (subject_name, isDarkTheme(), self.devicePixelRatioF()),
+                lambda: QIcon(self.get_subject_pixmap(subject_name))
+            )
 
         elif path == 'widget-next-activity.ui':  # 接下来的活动
-            self.nl_text.setText(get_next_lessons_text())
+            self.view.set_text(self.nl_text, state.next_lessons_text)
 
         if path == 'widget-countdown.ui':  # 活动倒计时
             if cd_list:
-                if conf.read_conf('General', 'blur_countdown') == '1':  # 模糊倒计时
+                if snapshot.blur_countdown:  # 模糊倒计时
                     if cd_list[1] == '00:00':
-                        self.activity_countdown.setText(f"< - 分钟")
+                        self.view.set_text(self.activity_countdown, f"< - 分钟")
                     else:
-                        self.activity_countdown.setText(f"< {int(cd_list[1].split(':')[0]) + 1} 分钟")
+                        self.view.set_text(self.activity_countdown, f"< {int(cd_list[1].split(':')[0]) + 1} 分钟")
                 else:
-                    self.activity_countdown.setText(cd_list[1])
-                self.ac_title.setText(cd_list[0])
-                self.countdown_progress_bar.setValue(cd_list[2])
+                    self.view.set_text(self.activity_countdown, cd_list[1])
+                self.view.set_text(self.ac_title, cd_list[0])
+                self.view.set_value(self.countdown_progress_bar, cd_list[2])
 
         if path == 'widget-countdown-custom.ui':  # 自定义倒计时
-            self.custom_title.setText(f'距离 {conf.read_conf("Date", "cd_text_custom")} 还有')
-            self.custom_countdown.setText(conf.get_custom_countdown())
-        self.update()
-
-    def get_weather_data(self):
+            self.view.set_text(self.custom_title, f'距离 {snapshot.cd_text_custom} 还有')
+            self.view.set_text(self.custom_countdown, state.custom_countdown)
+
+    def get_subject_pixmap(self, subject_name):  # 课程图标（缓存，暗色模式下着色为白色）
+        dark = isDarkTheme()
+        theme_config = conf.theme_registry.get(theme)
+        tint = None
+        if dark and (theme_config.support_dark_mode or theme_config.default_theme == 'dark'):  # 在暗色模式显示亮色图标
+            tint = '#FFFFFF'
+        return utils.subject_icon_cache.get(list.get_subject_icon(subject_name), dark, self.devicePixelRatioF(), tint)
+
+    def get_weather_data(self, refresh=False):
         logger.info('获取天气数据')
-        self.weather_thread = weatherReportThread()
+        self.weather_thread = weatherReportThread(refresh)
         self.weather_thread.weather_signal.connect(self.update_weather_data)
         self.weather_thread.start()
 
-    def detect_weather_code_changed(self):
-        current_code = conf.read_conf('Weather')
-        if current_code != self.last_code:
-            self.last_code = current_code
-            self.get_weather_data()
-
-    def detect_theme_changed(self):
-        theme = conf.read_conf('General', 'theme')
-        color_mode = conf.read_conf('General', 'color_mode')
-        widgets = list.get_widget_config()
-        if theme != self.last_theme or color_mode != self.last_color_mode or widgets != self.last_widgets:
-            self.last_theme = theme
-            self.last_color_mode = color_mode
-            self.last_widgets = widgets
-            logger.info(f'切换主题：{theme}，颜色模式{color_mode}')
-            mgr.clear_widgets()
+    def on_weather_city_changed(self, api, city):  # 天气API/城市/密钥变化
+        logger.info(f'切换天气：{api}，城市代码{city}')
+        self.get_weather_data(refresh=True)  # 缓存不区分密钥，更换密钥后需重新请求
 
     def update_weather_data(self, weather_data):  # 更新天气数据(已兼容多api)
         global weather_name, temperature, weather_data_temp
@@ -1464,12 +1813,12 @@ class DesktopWidget(QWidget):  # 主要小组件
             weather_data = weather_data.get('now')
             weather_data_temp = weather_data
 
-            weather_name = db.get_weather_by_code(db.get_weather_data('icon', weather_data))
+            catalog = db.get_catalog()
+            weather_code = db.get_weather_data('icon', weather_data)
+            weather_name = catalog.description(weather_code)
             current_city = self.findChild(QLabel, 'current_city')
             try:  # 天气组件
-                self.weather_icon.setPixmap(
-                    QPixmap(db.get_weather_icon_by_code(db.get_weather_data('icon', weather_data)))
-                )
+                self.weather_icon.setPixmap(QPixmap(catalog.icon(weather_code)))
                 self.alert_icon.hide()
                 if db.is_supported_alert():
                     # print(alert_data if alert_data else weather_data)
@@ -1481,10 +1830,10 @@ class DesktopWidget(QWidget):  # 主要小组件
                         self.alert_icon.show()
 
                 self.temperature.setText(f"{db.get_weather_data('temp', weather_data)}")
-                current_city.setText(f"{db.search_by_num(conf.read_conf('Weather', 'city'))} · "
+                current_city.setText(f"{db.search_by_num(conf.get_snapshot().weather_city)} · "
                                      f"{weather_name}")
                 update_stylesheet = re.sub(r'border-image: url\((.*?)\);',
-                                           f"border-image: url({db.get_weather_stylesheet(db.get_weather_data('icon', weather_data))});",
+                                           f"border-image: url({catalog.background(weather_code)});",
                                            self.backgnd.styleSheet())
                 self.backgnd.setStyleSheet(update_stylesheet)
             except Exception as e:
@@ -1563,7 +1912,7 @@ class DesktopWidget(QWidget):  # 主要小组件
     def animate_hide_opacity(self):  # 隐藏窗口透明度
         self.animation = QPropertyAnimation(self, b"windowOpacity")
         self.animation.setDuration(300)  # 持续时间
-        self.animation.setStartValue(int(conf.read_conf('General', 'opacity')) / 100)
+        self.animation.setStartValue(conf.get_snapshot().opacity)
         self.animation.setEndValue(0)
         self.animation.setEasingCurve(QEasingCurve.Type.InOutCirc)  # 设置动画效果
         self.animation.start()
@@ -1573,7 +1922,7 @@ class DesktopWidget(QWidget):  # 主要小组件
         self.animation = QPropertyAnimation(self, b"windowOpacity")
         self.animation.setDuration(350)  # 持续时间
         self.animation.setStartValue(0)
-        self.animation.setEndValue(int(conf.read_conf('General', 'opacity')) / 100)
+        self.animation.setEndValue(conf.get_snapshot().opacity)
         self.animation.setEasingCurve(QEasingCurve.Type.InOutCirc)  # 设置动画效果
         self.animation.start()
         self.animation.finished.connect(self.clear_animation)
@@ -1583,7 +1932,7 @@ class DesktopWidget(QWidget):  # 主要小组件
         self.animation.setDuration(625)  # 持续时间
         # 获取当前窗口的宽度和高度，确保动画过程中保持一致
         self.animation.setEndValue(
-            QRect(self.x(), int(conf.read_conf('General', 'margin')), self.width(), self.height()))
+            QRect(self.x(), conf.get_snapshot().margin, self.width(), self.height()))
         self.animation.setEasingCurve(QEasingCurve.Type.InOutCirc)  # 设置动画效果
         self.animation.finished.connect(self.clear_animation)
 
@@ -1613,9 +1962,10 @@ class DesktopWidget(QWidget):  # 主要小组件
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.MouseButton.RightButton:
             return  # 右键不执行
-        if conf.read_conf('General', 'pin_on_top') == '2':  # 置底
+        snapshot = conf.get_snapshot()
+        if snapshot.pin_on_top == 2:  # 置底
             return  # 置底不执行
-        if conf.read_conf('General', 'hide') != '2':  # 置顶
+        if snapshot.hide != conf.HideMode.MAXIMIZED:  # 置顶
             if mgr.state:
                 mgr.decide_to_hide()
             else:
@@ -1628,12 +1978,13 @@ class DesktopWidget(QWidget):  # 主要小组件
         super().closeEvent(event)
         self.destroy()
 
-        if hasattr(self, 'w_d_timer'):
-            self.w_d_timer.stop()  # 停止定时器
-        if hasattr(self, 'd_t_timer'):
-            self.d_t_timer.stop()  # 停止定时器
+        if self.path == 'widget-weather.ui':
+            try:
+                utils.config_watcher.weatherCityChanged.disconnect(self.on_weather_city_changed)
+            except TypeError:  # 已断开
+                pass
         if hasattr(self, 'weather_thread'):
-            self.weather_timer.stop()  # 停止定时器
+            timer_wheel.cancel(getattr(self, 'weather_job', None))  # 停止定时任务
             self.weather_thread.terminate()  # 终止天气线程
             self.weather_thread.quit()  # 退出天气线程
 
@@ -1649,10 +2000,22 @@ def check_windows_maximize():  # 检查窗口是否最大化
 
 
 def init_config():  # 重设配置文件
-    conf.write_conf('Temp', 'set_week', '')
-    if conf.read_conf('Temp', 'temp_schedule') != '':  # 修复换课重置
-        copy(f'{base_directory}/config/schedule/backup.json', f'{base_directory}/config/schedule/{filename}')
-        conf.write_conf('Temp', 'temp_schedule', '')
+    with conf.config_transaction():
+        conf.write_conf('Temp', 'set_week', '')
+        if conf.read_conf('Temp', 'temp_schedule') != '':  # 修复换课重置
+            copy(f'{base_directory}/config/schedule/backup.json', f'{base_directory}/config/schedule/{filename}')
+            conf.write_conf('Temp', 'temp_schedule', '')
+
+
+def on_theme_changed(theme_, color_mode):  # 主题/颜色模式变化
+    utils.subject_icon_cache.clear()
+    logger.info(f'切换主题：{theme_}，颜色模式{color_mode}')
+    mgr.clear_widgets()
+
+
+def on_widgets_changed(widgets):  # 小组件列表变化
+    logger.info(f'小组件列表变化：{widgets}')
+    mgr.clear_widgets()
 
 
 def show_window(path, pos, enable_tray=False):
@@ -1661,7 +2024,7 @@ def show_window(path, pos, enable_tray=False):
 
 
 def init():
-    global theme, radius, mgr, screen_width, first_start, fw, update_timer
+    global theme, radius, mgr, screen_width, first_start, fw
 
     theme = conf.read_conf('General', 'theme')  # 主题
 
@@ -1670,6 +2033,8 @@ def init():
         theme = 'default'
 
     mgr = WidgetsManager()
+    if fw is not None:  # 重新初始化时停止旧浮窗的刷新
+        timer_wheel.cancel(fw.update_job)
     fw = FloatingWidget()
 
     logger.info(f'应用主题：{theme}')
@@ -1685,9 +2050,7 @@ def init():
 
     mgr.init_widgets()
 
-    update_timer.timeout.connect(update_time)
-    update_timer.setInterval(1000)
-    update_time()
+    tick_scheduler.start()
 
     logger.info(f'Class Widgets 启动。版本: {conf.read_conf("Other", "version")}')
     p_loader.run_plugins()  # 运行插件
@@ -1696,10 +2059,9 @@ def init():
 
 
 def update_time():
-    mgr.update_widgets()
-    next_second = (dt.datetime.now() + dt.timedelta(seconds=1)).replace(microsecond=0)
-    delay = (next_second - dt.datetime.now()).total_seconds() * 1000  # 转换为毫秒
-    update_timer.singleShot(int(delay), update_time)
+    with utils.tick_profiler.measure('tick'):
+        mgr.update_widgets()
+    utils.tick_profiler.end_tick()
 
 
 if __name__ == '__main__':
@@ -1709,6 +2071,9 @@ if __name__ == '__main__':
 
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
+    if '--profile-ticks' in sys.argv:  # 定期在日志中输出刷新耗时统计
+        utils.tick_profiler.enabled = True
+        logger.info('已启用刷新耗时统计')
     share.create(1)  # 创建共享内存
     logger.info(f"共享内存：{share.isAttached()} 是否允许多开实例：{conf.read_conf('Other', 'multiple_programs')}")
 
@@ -1763,17 +2128,26 @@ if __name__ == '__main__':
             except Exception as e:
                 logger.error(f'创建新课表失败：{e}')
 
+        utils.config_watcher = utils.ConfigWatcher()  # 监听配置文件变化
+        utils.config_watcher.themeChanged.connect(on_theme_changed)
+        utils.config_watcher.widgetsChanged.connect(on_widgets_changed)
+        utils.config_watcher.scheduleFileChanged.connect(conf.invalidate_schedule)
+        utils.config_watcher.weatherCityChanged.connect(db.on_api_changed)
+        timer_wheel = TimerWheel()  # 统一定时调度
+        utils.tick_profiler.reporters.append(timer_wheel.summary)
+        bell_scheduler = BellScheduler()  # 上下课提醒
+        utils.config_watcher.bellSettingsChanged.connect(bell_scheduler.on_settings_changed)
+        tick_scheduler = TickScheduler(update_time)  # 每秒刷新
+
         p_mgr = PluginManager()
         p_loader.set_manager(p_mgr)
         p_loader.load_plugins()
 
         init()
-        get_start_time()
-        get_current_lessons()
-        get_current_lesson_name()
-        get_next_lessons()
+        app.primaryScreen().availableGeometryChanged.connect(lambda: mgr.invalidate_layout())
+        timer_wheel.once(notification.window_pool.warm_up, 5, name='toast_warm_up')  # 启动完成后预先创建通知窗口
 
-        if current_state == 1:
+        if update_tick_state().state == 1:
             setThemeColor(f"#{conf.read_conf('Color', 'attend_class')}")
         else:
             setThemeColor(f"#{conf.read_conf('Color', 'finish_class')}")
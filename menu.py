@@ -8,8 +8,8 @@ from copy import deepcopy
 from pathlib import Path
 from shutil import rmtree
 
-from PyQt5 import uic, QtCore
-from PyQt5.QtCore import Qt, QTime, QUrl, QDate, pyqtSignal
+from PyQt5 import QtCore
+from PyQt5.QtCore import Qt, QTime, QUrl, QDate, pyqtSignal, QTimer
 from PyQt5.QtGui import QIcon, QDesktopServices, QColor
 from PyQt5.QtWidgets import QApplication, QHeaderView, QTableWidgetItem, QLabel, QHBoxLayout, QSizePolicy, \
     QSpacerItem, QFileDialog, QVBoxLayout, QScroller
@@ -194,8 +194,13 @@ class selectCity(MessageBoxBase):  # 选择城市
 
         self.search_edit.setPlaceholderText('输入城市名')
         self.search_edit.setClearButtonEnabled(True)
-        self.search_edit.textChanged.connect(self.search_city)
+        self.search_timer = QTimer(self)  # 停止输入后再搜索，避免每次按键都查询
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.search_city)
+        self.search_edit.textChanged.connect(self.search_timer.start)
 
+        wd.get_city_index().start_indexing()  # 后台建立搜索索引，完成前使用普通查询
         self.city_list = ListWidget()
         self.city_list.addItems(wd.search_by_name(''))
         self.get_selected_city()
@@ -471,32 +476,50 @@ class SettingsMenu(FluentWindow):
         super().__init__()
         self.button_clear_log = None
         self.version_thread = None
+        self.pending_conf = {}  # 尚未写入的设置 {(section, key): value}
+        self.conf_timer = QTimer(self)  # 滑块等连续变化时合并写入
+        self.conf_timer.setSingleShot(True)
+        self.conf_timer.setInterval(300)
+        self.conf_timer.timeout.connect(self.flush_conf)
 
         # 创建子页面
-        self.spInterface = uic.loadUi(f'{base_directory}/view/menu/preview.ui')  # 预览
+        self.spInterface = utils.load_ui(f'{base_directory}/view/menu/preview.ui')  # 预览
         self.spInterface.setObjectName("spInterface")
-        self.teInterface = uic.loadUi(f'{base_directory}/view/menu/timeline_edit.ui')  # 时间线编辑
+        self.teInterface = utils.load_ui(f'{base_directory}/view/menu/timeline_edit.ui')  # 时间线编辑
         self.teInterface.setObjectName("teInterface")
-        self.seInterface = uic.loadUi(f'{base_directory}/view/menu/schedule_edit.ui')  # 课程表编辑
+        self.seInterface = utils.load_ui(f'{base_directory}/view/menu/schedule_edit.ui')  # 课程表编辑
         self.seInterface.setObjectName("seInterface")
-        self.adInterface = uic.loadUi(f'{base_directory}/view/menu/advance.ui')  # 高级选项
+        self.adInterface = utils.load_ui(f'{base_directory}/view/menu/advance.ui')  # 高级选项
         self.adInterface.setObjectName("adInterface")
-        self.ifInterface = uic.loadUi(f'{base_directory}/view/menu/about.ui')  # 关于
+        self.ifInterface = utils.load_ui(f'{base_directory}/view/menu/about.ui')  # 关于
         self.ifInterface.setObjectName("ifInterface")
-        self.ctInterface = uic.loadUi(f'{base_directory}/view/menu/custom.ui')  # 自定义
+        self.ctInterface = utils.load_ui(f'{base_directory}/view/menu/custom.ui')  # 自定义
         self.ctInterface.setObjectName("ctInterface")
-        self.cfInterface = uic.loadUi(f'{base_directory}/view/menu/configs.ui')  # 配置文件
+        self.cfInterface = utils.load_ui(f'{base_directory}/view/menu/configs.ui')  # 配置文件
         self.cfInterface.setObjectName("cfInterface")
-        self.sdInterface = uic.loadUi(f'{base_directory}/view/menu/sound.ui')  # 通知
+        self.sdInterface = utils.load_ui(f'{base_directory}/view/menu/sound.ui')  # 通知
         self.sdInterface.setObjectName("sdInterface")
-        self.hdInterface = uic.loadUi(f'{base_directory}/view/menu/help.ui')  # 帮助
+        self.hdInterface = utils.load_ui(f'{base_directory}/view/menu/help.ui')  # 帮助
         self.hdInterface.setObjectName("hdInterface")
-        self.plInterface = uic.loadUi(f'{base_directory}/view/menu/plugin_mgr.ui')  # 插件
+        self.plInterface = utils.load_ui(f'{base_directory}/view/menu/plugin_mgr.ui')  # 插件
         self.plInterface.setObjectName("plInterface")
 
         self.init_nav()
         self.init_window()
 
+    def write_conf_later(self, section, key, value):  # 延迟写入，停止调节后一次性落盘
+        self.pending_conf[(section, key)] = value
+        self.conf_timer.start()
+
+    def flush_conf(self):  # 写入所有待保存的设置
+        self.conf_timer.stop()
+        if not self.pending_conf:
+            return
+        pending, self.pending_conf = self.pending_conf, {}
+        with conf.config_transaction():
+            for (section, key), value in pending.items():
+                conf.write_conf(section, key, value)
+
     def init_font(self):  # 设置字体
         self.setStyleSheet("""QLabel {
                     font-family: 'Microsoft YaHei';
@@ -531,7 +554,7 @@ class SettingsMenu(FluentWindow):
 
         auto_delay = self.findChild(SpinBox, 'auto_delay')
         auto_delay.setValue(int(conf.read_conf('Plugin', 'auto_delay')))
-        auto_delay.valueChanged.connect(lambda: conf.write_conf('Plugin', 'auto_delay', str(auto_delay.value())))
+        auto_delay.valueChanged.connect(lambda: self.write_conf_later('Plugin', 'auto_delay', str(auto_delay.value())))
         # 设置自动化延迟
 
         plugin_card_layout = self.findChild(QVBoxLayout, 'plugin_card_layout')
@@ -659,7 +682,7 @@ class SettingsMenu(FluentWindow):
 
         set_wcc_title = self.findChild(LineEdit, 'set_wcc_title')  # 倒计时标题
         set_wcc_title.setText(conf.read_conf('Date', 'cd_text_custom'))
-        set_wcc_title.textChanged.connect(lambda: conf.write_conf('Date', 'cd_text_custom', set_wcc_title.text()))
+        set_wcc_title.textChanged.connect(lambda: self.write_conf_later('Date', 'cd_text_custom', set_wcc_title.text()))
 
         set_countdown_date = self.findChild(CalendarPicker, 'set_countdown_date')  # 倒计时日期
         if conf.read_conf('Date', 'countdown_date') != '':
@@ -704,7 +727,7 @@ class SettingsMenu(FluentWindow):
         slider_opacity = self.findChild(Slider, 'slider_opacity')
         slider_opacity.setValue(int(conf.read_conf('General', 'opacity')))
         slider_opacity.valueChanged.connect(
-            lambda: conf.write_conf('General', 'opacity', str(slider_opacity.value()))
+            lambda: self.write_conf_later('General', 'opacity', str(slider_opacity.value()))
         )  # 透明度
 
         blur_countdown = self.findChild(SwitchButton, 'switch_blur_countdown')
@@ -724,7 +747,7 @@ class SettingsMenu(FluentWindow):
 
         api_key_edit = self.findChild(LineEdit, 'api_key_edit')  # API密钥
         api_key_edit.setText(conf.read_conf('Weather', 'api_key'))
-        api_key_edit.textChanged.connect(lambda: conf.write_conf('Weather', 'api_key', api_key_edit.text()))
+        api_key_edit.textChanged.connect(lambda: self.write_conf_later('Weather', 'api_key', api_key_edit.text()))
 
     def setup_about_interface(self):
         ab_scroll = self.findChild(SmoothScrollArea, 'ab_scroll')  # 触摸屏适配
@@ -773,7 +796,7 @@ class SettingsMenu(FluentWindow):
         margin_spin = self.adInterface.findChild(SpinBox, 'margin_spin')
         margin_spin.setValue(int(conf.read_conf('General', 'margin')))
         margin_spin.valueChanged.connect(
-            lambda: conf.write_conf('General', 'margin', str(margin_spin.value()))
+            lambda: self.write_conf_later('General', 'margin', str(margin_spin.value()))
         )  # 保存边距设定
 
         self.conf_combo = self.adInterface.findChild(ComboBox, 'conf_combo')
@@ -861,7 +884,7 @@ class SettingsMenu(FluentWindow):
         offset_spin = self.adInterface.findChild(SpinBox, 'offset_spin')
         offset_spin.setValue(int(conf.read_conf('General', 'time_offset')))
         offset_spin.valueChanged.connect(
-            lambda: conf.write_conf('General', 'time_offset', str(offset_spin.value()))
+            lambda: self.write_conf_later('General', 'time_offset', str(offset_spin.value()))
         )  # 保存时差偏移
 
         text_scale_factor = self.adInterface.findChild(LineEdit, 'text_scale_factor')
@@ -870,7 +893,7 @@ class SettingsMenu(FluentWindow):
         slider_scale_factor = self.adInterface.findChild(Slider, 'slider_scale_factor')
         slider_scale_factor.setValue(int(float(conf.read_conf('General', 'scale')) * 100))
         slider_scale_factor.valueChanged.connect(
-            lambda: (conf.write_conf('General', 'scale', str(slider_scale_factor.value() / 100)),
+            lambda: (self.write_conf_later('General', 'scale', str(slider_scale_factor.value() / 100)),
                      text_scale_factor.setText(str(slider_scale_factor.value()) + '%'))
         )  # 保存缩放系数
 
@@ -1014,7 +1037,7 @@ class SettingsMenu(FluentWindow):
 
     def save_volume(self):
         slider_volume = self.findChild(Slider, 'slider_volume')
-        conf.write_conf('Audio', 'volume', str(slider_volume.value()))
+        self.write_conf_later('Audio', 'volume', str(slider_volume.value()))
 
     def show_search_city(self):
         search_city_dialog = selectCity(self)
@@ -1029,7 +1052,7 @@ class SettingsMenu(FluentWindow):
 
     def save_prepare_time(self):
         prepare_time_spin = self.findChild(SpinBox, 'spin_prepare_class')
-        conf.write_conf('Toast', 'prepare_minutes', str(prepare_time_spin.value()))
+        self.write_conf_later('Toast', 'prepare_minutes', str(prepare_time_spin.value()))
 
     def clear_log(self):  # 清空日志
         def get_directory_size(path):  # 计算目录大小
@@ -1299,7 +1322,7 @@ class SettingsMenu(FluentWindow):
 
             for i in range(len(widget_config)):
                 widget_name = widget_config[i]
-                if isDarkTheme() and conf.load_theme_config(theme_folder)['support_dark_mode']:
+                if isDarkTheme() and conf.theme_registry.get(theme_folder).support_dark_mode:
                     if os.path.exists(f'{base_directory}/ui/{theme_folder}/dark/preview/{widget_name[:-3]}.png'):
                         path = f'{base_directory}/ui/{theme_folder}/dark/preview/{widget_name[:-3]}.png'
                     else:
@@ -1949,6 +1972,7 @@ class SettingsMenu(FluentWindow):
         self.init_font()  # 设置字体
 
     def closeEvent(self, event):
+        self.flush_conf()
         self.closed.emit()
         event.accept()
 
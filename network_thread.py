@@ -368,8 +368,9 @@ def check_version(version):  # 检查更新
 class weatherReportThread(QThread):  # 获取最新天气信息
     weather_signal = pyqtSignal(dict)
 
-    def __init__(self):
+    def __init__(self, refresh=False):
         super().__init__()
+        self.refresh = refresh  # 定时刷新：忽略缓存有效期（仍使用条件请求）
 
     def run(self):
         try:
@@ -378,40 +379,75 @@ class weatherReportThread(QThread):  # 获取最新天气信息
         except Exception as e:
             logger.error(f"触发天气信息失败: {e}")
 
+    @staticmethod
+    def get_validators(response):  # 响应的缓存校验信息
+        return {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
 
     def get_weather_data(self):
-        location_key = conf.read_conf('Weather', 'city')
+        snapshot = conf.get_snapshot()
+        api = snapshot.weather_api
+        location_key = snapshot.weather_city
         days = 1
-        key = conf.read_conf('Weather', 'api_key')
+        key = snapshot.weather_api_key
+        cached = db.weather_cache.get(api, location_key, snapshot.weather_cache_max_age)
+        if cached is not None and not self.refresh and cached.is_fresh():
+            logger.info('天气数据缓存未过期，不再请求')
+            return cached.data
+
         url = db.get_weather_url().format(location_key=location_key, days=days, key=key)
         alert_url = db.get_weather_alert_url()
         try:
             data_group = {'now': {}, 'alert': {}}
-            response_now = requests.get(url, proxies=proxies)  # 禁用代理
+            validators = {}
+            response_now = requests.get(
+                url, headers=cached.request_headers('now') if cached else None, proxies=proxies  # 禁用代理
+            )
             if alert_url == 'NotSupported':
                 logger.warning(f"当前API不支持天气预警信息")
             elif alert_url is None:
                 logger.warning(f"无单独天气预警信息API")
             else:
                 alert_url = alert_url.format(location_key=location_key, key=key)
-                response_alert = requests.get(alert_url, proxies=proxies)
-
-                if response_alert.status_code == 200:
+                response_alert = requests.get(
+                    alert_url, headers=cached.request_headers('alert') if cached else None, proxies=proxies
+                )
+
+                if response_alert.status_code == 304 and cached:  # 未变化
+                    data_group['alert'] = cached.data.get('alert', {})
+                    validators['alert'] = cached.validators.get('alert')
+                elif response_alert.status_code == 200:
                     data_alert = response_alert.json()
                     data_group['alert'] = data_alert
+                    validators['alert'] = self.get_validators(response_alert)
                 else:
                     logger.error(f"获取天气预警信息失败：{response_alert.status_code}")
 
-            if response_now.status_code == 200:
+            if response_now.status_code == 304 and cached:  # 未变化，沿用缓存
+                logger.info('天气数据未变化')
+                data_group['now'] = cached.data['now']
+                validators['now'] = cached.validators.get('now')
+            elif response_now.status_code == 200:
                 data = response_now.json()
                 data_group['now'] = data
-                return data_group
+                validators['now'] = self.get_validators(response_now)
             else:
                 logger.error(f"获取天气信息失败：{response_now.status_code}")
-                return {'error': {'info': {'value': '错误', 'unit': response_now.status_code}}}
+                return self.fallback(cached, {'error': {'info': {'value': '错误', 'unit': response_now.status_code}}})
+            if not db.get_adapter(api).is_valid(data_group['now']):  # 错误信息不写入缓存
+                logger.error(f"天气API返回错误：{data_group['now']}")
+                return self.fallback(cached, {'error': {'info': {'value': '错误', 'unit': ''}}})
+            db.weather_cache.put(api, location_key, data_group, validators, snapshot.weather_cache_ttl)
+            return data_group
         except requests.exceptions.RequestException as e:  # 请求失败
             logger.error(f"获取天气信息失败：{e}")
-            return {'error': {'info': {'value': '错误', 'unit': ''}}}
+            return self.fallback(cached, {'error': {'info': {'value': '错误', 'unit': ''}}})
         except Exception as e:
             logger.error(f"获取天气信息失败：{e}")
-            return {'error': {'info': {'value': '错误', 'unit': ''}}}
+            return self.fallback(cached, {'error': {'info': {'value': '错误', 'unit': ''}}})
+
+    @staticmethod
+    def fallback(cached, error):  # 请求失败时使用未超过最长保留时间的缓存
+        if cached is not None:
+            logger.warning(f'使用 {int(cached.age() // 60)} 分钟前的天气缓存')
+            return cached.data
+        return error
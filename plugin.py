@@ -4,6 +4,7 @@ from pathlib import Path
 from loguru import logger
 
 import conf
+from utils import tick_profiler
 
 
 class PluginLoader:  # 插件加载器
@@ -49,9 +50,10 @@ class PluginLoader:  # 插件加载器
             plugin.execute()
 
     def update_plugins(self):
-        for plugin in self.plugins_dict.values():
+        for name, plugin in self.plugins_dict.items():
             if hasattr(plugin, 'update'):
-                plugin.update(self.manager.get_app_contexts())
+                with tick_profiler.measure(f'plugin:{name}'):
+                    plugin.update(self.manager.get_app_contexts())
 
 
 p_loader = PluginLoader()
@@ -3,7 +3,6 @@ import sys
 from datetime import datetime
 from random import shuffle
 
-from PyQt5 import uic
 from PyQt5.QtCore import QSize, Qt, QTimer, QUrl, QStringListModel, pyqtSignal
 from PyQt5.QtGui import QIcon, QPixmap, QDesktopServices
 from PyQt5.QtWidgets import QApplication, QHBoxLayout, QVBoxLayout, QGridLayout, QSpacerItem, QSizePolicy, QWidget, \
@@ -21,7 +20,7 @@ import list as l
 import network_thread as nt
 from conf import base_directory
 from plugin import p_loader
-from utils import restart, calculate_size
+from utils import restart, calculate_size, load_ui
 
 # 适配高DPI缩放
 QApplication.setHighDpiScaleFactorRoundingPolicy(
@@ -282,7 +281,7 @@ class PluginDetailPage(MessageBoxBase):  # 插件详情页面
     def init_ui(self):
         # 加载ui文件
         self.temp_widget = QWidget()
-        uic.loadUi(f'{base_directory}/view/pp/plugin_detail.ui', self.temp_widget)
+        load_ui(f'{base_directory}/view/pp/plugin_detail.ui', self.temp_widget)
         self.viewLayout.addWidget(self.temp_widget)
         self.viewLayout.setContentsMargins(0, 0, 0, 0)
         # 隐藏原有按钮
@@ -420,13 +419,13 @@ class PluginPlaza(MSFluentWindow):
         except Exception as e:
             logger.error(f"读取已安装的插件失败: {e}")
         try:
-            self.homeInterface = uic.loadUi(f'{base_directory}/view/pp/home.ui')  # 首页
+            self.homeInterface = load_ui(f'{base_directory}/view/pp/home.ui')  # 首页
             self.homeInterface.setObjectName("homeInterface")
-            self.latestsInterface = uic.loadUi(f'{base_directory}/view/pp/latests.ui')  # 最新更新
+            self.latestsInterface = load_ui(f'{base_directory}/view/pp/latests.ui')  # 最新更新
             self.latestsInterface.setObjectName("latestInterface")
-            self.settingsInterface = uic.loadUi(f'{base_directory}/view/pp/settings.ui')  # 设置
+            self.settingsInterface = load_ui(f'{base_directory}/view/pp/settings.ui')  # 设置
             self.settingsInterface.setObjectName("settingsInterface")
-            self.searchInterface = uic.loadUi(f'{base_directory}/view/pp/search.ui')  # 搜索
+            self.searchInterface = load_ui(f'{base_directory}/view/pp/search.ui')  # 搜索
             self.searchInterface.setObjectName("searchInterface")
 
             load_local_plugins_version()  # 加载本地插件版本
@@ -0,0 +1,40 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+# 导入模块时会创建 config.ini、日志、缓存等文件，测试在项目副本中进行，不修改工作区
+repo_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+test_directory = tempfile.mkdtemp(prefix='class-widgets-test-')
+base_directory = os.path.join(test_directory, 'Class-Widgets')
+shutil.copytree(repo_directory, base_directory, ignore=shutil.ignore_patterns(
+    '.git', 'tests', 'cache', 'log', 'config.ini', '__pycache__', '*.whl'
+))
+sys.path.insert(0, base_directory)
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(test_directory, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def config_file():  # 测试结束后还原 config.ini
+    import conf  # 导入时按默认配置创建 config.ini
+    import file
+    with open(file.path, encoding='utf-8') as f:
+        content = f.read()
+    yield file.path
+    with open(file.path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    file.invalidate_conf()
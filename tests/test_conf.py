@@ -0,0 +1,42 @@
+import configparser
+import json
+
+import conf
+from file import load_default_conf
+
+
+def test_migrate_config_fills_missing_options():
+    default_conf = load_default_conf()
+    data = configparser.ConfigParser()
+    data.read_dict({'General': {'margin': '42'}, 'Other': {'version': '0.0.0'}})
+    assert conf.migrate_config(data, default_conf)
+    assert data.get('General', 'margin') == '42'  # 已有的值保持不变
+    assert data.get('Other', 'version') == default_conf['Other']['version']
+    for section, options in default_conf.items():
+        for key in options:
+            assert data.has_option(section, key)
+
+
+def test_migrate_config_unchanged_when_up_to_date():
+    data = configparser.ConfigParser()
+    data.read_dict(load_default_conf())
+    assert not conf.migrate_config(data, load_default_conf())
+
+
+def test_migrate_config_updates_version_only():
+    default_conf = load_default_conf()
+    data = configparser.ConfigParser()
+    data.read_dict(default_conf)
+    data.set('Other', 'version', '0.0.0')
+    data.set('General', 'margin', '42')
+    assert conf.migrate_config(data, default_conf)
+    assert data.get('Other', 'version') == default_conf['Other']['version']
+    assert data.get('General', 'margin') == '42'
+
+
+def test_load_theme_config_returns_copy():
+    data = conf.load_theme_config('default')
+    assert type(data) is dict
+    data['name'] = 'changed'
+    json.dumps(data)
+    assert conf.theme_registry.get('default').data['name'] != 'changed'
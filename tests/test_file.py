@@ -0,0 +1,86 @@
+import os
+import threading
+
+import pytest
+
+import file
+
+
+def test_transaction_writes_once(config_file, monkeypatch):
+    saves = []
+    save_conf = file.save_conf
+    monkeypatch.setattr(file, 'save_conf', lambda data: (saves.append(data), save_conf(data)))
+    with file.config_transaction():
+        file.write_conf('General', 'margin', '12')
+        file.write_conf('General', 'opacity', '50')
+        assert file.read_conf('General', 'margin') == '12'
+    assert len(saves) == 1
+    file.invalidate_conf()
+    assert file.read_conf('General', 'margin') == '12'
+    assert file.read_conf('General', 'opacity') == '50'
+
+
+def test_transaction_rolls_back_on_error(config_file):
+    file.write_conf('General', 'margin', '10')
+    with pytest.raises(RuntimeError):
+        with file.config_transaction():
+            file.write_conf('General', 'margin', '12')
+            raise RuntimeError
+    assert file.read_conf('General', 'margin') == '10'
+
+
+def test_transaction_is_private_to_its_thread(config_file):
+    file.write_conf('General', 'margin', '10')
+    seen = []
+    with file.config_transaction():
+        file.write_conf('General', 'margin', '12')
+        reader = threading.Thread(target=lambda: seen.append(file.read_conf('General', 'margin')))
+        reader.start()
+        reader.join()
+        writer = threading.Thread(target=lambda: file.write_conf('General', 'opacity', '50'))
+        writer.start()
+        writer.join(0.2)
+        assert writer.is_alive()  # 等待事务提交
+    writer.join()
+    assert seen == ['10']
+    assert file.read_conf('General', 'margin') == '12'
+    assert file.read_conf('General', 'opacity') == '50'
+
+
+def test_save_conf_removes_temp_file(config_file):
+    class BrokenConfig:
+        def write(self, configfile):
+            raise OSError('disk full')
+
+    with pytest.raises(OSError):
+        file.save_conf(BrokenConfig())
+    assert not os.path.exists(f'{file.path}.tmp')
+
+
+def test_snapshot_types_and_defaults():
+    data = file.config.ConfigParser()
+    data.read_dict({'General': {'opacity': '80', 'margin': 'abc', 'hide': '7'}, 'Temp': {'set_week': '3'}})
+    snapshot = file.ConfigSnapshot(data, file.load_default_conf())
+    assert snapshot.opacity == 0.8
+    assert snapshot.margin == int(file.load_default_conf()['General']['margin'])  # 无效值回退到默认值
+    assert snapshot.hide == file.HideMode.NONE
+    assert snapshot.set_week == 3
+    assert snapshot.schedule == file.load_default_conf()['General']['schedule']
+
+
+def test_snapshot_rebuilt_only_after_change(config_file):
+    file.write_conf('General', 'margin', '10')
+    snapshot = file.get_snapshot()
+    assert file.get_snapshot() is snapshot
+    file.write_conf('General', 'margin', '20')
+    assert file.get_snapshot() is not snapshot
+    assert file.get_snapshot().margin == 20
+
+
+def test_snapshot_matches_read_conf_in_transaction(config_file):
+    file.write_conf('General', 'margin', '10')
+    with file.config_transaction():
+        file.write_conf('General', 'margin', '12')
+        assert file.read_conf('General', 'margin') == '12'
+        assert file.get_snapshot().margin == 12
+    assert file.get_snapshot().margin == 12
@@ -0,0 +1,274 @@
+import datetime as dt
+
+import pytest
+
+import main
+
+schedule_data = {
+    'part': {'0': [8, 0, 'part'], '1': [12, 0, 'break'], '2': [14, 0, 'part']},
+    'part_name': {'0': '上午', '1': '午休', '2': '下午'},
+    'timeline': {'default': {'a01': '40', 'f01': '10', 'a02': '40', 'f11': '60', 'a21': '45', 'f21': '10', 'a22': '45'}},
+}
+lessons = {'a01': '语文', 'a02': '数学', 'a21': '英语', 'a22': '物理'}
+
+
+def seconds(h, m=0):
+    return h * 3600 + m * 60
+
+
+@pytest.fixture
+def day_plan(monkeypatch):
+    monkeypatch.setattr(main, 'loaded_data', schedule_data)
+    monkeypatch.setattr(main, 'current_lessons', lessons)
+    monkeypatch.setattr(main, 'time_offset', 0)
+    monkeypatch.setattr(main, 'bell_scheduler', None)
+    monkeypatch.setattr(main, 'day_plan', main.DayPlan())
+    main.compile_day_plan()
+    return main.day_plan
+
+
+def at(monkeypatch, h, m=0):
+    monkeypatch.setattr(main, 'current_seconds', seconds(h, m))
+
+
+def test_compile_day_plan(day_plan):
+    assert day_plan.part_keys == [0, 1, 2]
+    assert day_plan.part_types == ['part', 'break', 'part']
+    assert day_plan.part_ends == [seconds(9, 30), seconds(13), seconds(15, 40)]
+    assert day_plan.starts[:3] == [seconds(8), seconds(8, 40), seconds(8, 50)]
+    assert day_plan.kinds == ['a', 'f', 'a', 'f', 'a', 'f', 'a']
+    assert day_plan.lessons[0] == '语文'
+    assert day_plan.part_ranges == [(0, 3), (3, 4), (4, 7)]
+
+
+@pytest.mark.parametrize('t, part', [
+    (seconds(7), 0), (seconds(9, 30), 0), (seconds(10), 1), (seconds(13, 30), 2), (seconds(18), 2),
+])
+def test_find_part(day_plan, t, part):
+    assert day_plan.find_part(t) == part
+
+
+def test_find_part_empty():
+    assert main.DayPlan().find_part(0) is None
+
+
+def test_parse_timeline_item():
+    assert main.parse_timeline_item('a101', ['1', '10'], None, 0) == ('10', 1)  # 新节点的第一个活动
+    assert main.parse_timeline_item('a105', ['1', '10'], '1', 4) == ('1', 5)  # 当前节点的后续活动
+    assert main.parse_timeline_item('a31', ['1', '10'], None, 0) is None
+
+
+def test_get_part(day_plan, monkeypatch):
+    at(monkeypatch, 14, 30)
+    start, part = main.get_part()
+    assert part == 2
+    assert start == dt.datetime.combine(main.today, dt.time(14))
+
+
+def test_get_part_with_time_offset(day_plan, monkeypatch):
+    at(monkeypatch, 14, 30)
+    monkeypatch.setattr(main, 'time_offset', 60)
+    start, part = main.get_part()
+    assert part == 2
+    assert start == dt.datetime.combine(main.today, dt.time(14, 1))
+
+
+@pytest.mark.parametrize('h, m, expected', [
+    (6, 0, ['语文', '数学']),  # 第一个节点
+    (8, 45, ['数学']),
+    (12, 30, []),  # 休息段
+    (13, 30, ['英语', '物理']),
+    (15, 0, []),
+])
+def test_get_next_lessons(day_plan, monkeypatch, h, m, expected):
+    at(monkeypatch, h, m)
+    main.get_next_lessons()
+    assert main.next_lessons == expected
+
+
+@pytest.mark.parametrize('h, m, expected', [
+    (12, 50, []),  # 距下午节点 70 分钟
+    (13, 0, ['英语', '物理']),  # 恰好 60 分钟
+])
+def test_get_next_lessons_before_part(day_plan, monkeypatch, h, m, expected):
+    data = {**schedule_data, 'part': {'0': [8, 0, 'part'], '2': [14, 0, 'part']}}  # 无午休，直接等待下午节点
+    data['timeline'] = {'default': {k: v for k, v in schedule_data['timeline']['default'].items() if k != 'f11'}}
+    monkeypatch.setattr(main, 'loaded_data', data)
+    main.compile_day_plan()
+    at(monkeypatch, h, m)
+    main.get_next_lessons()
+    assert main.next_lessons == expected
+
+
+@pytest.mark.parametrize('h, m, name, state', [
+    (8, 20, '语文', 1),
+    (8, 45, '课间', 0),
+    (12, 30, '课间', 0),  # 与原实现一致：休息段内的课间仍显示为课间
+    (7, 0, '暂无课程', 0),
+])
+def test_get_current_lesson_name(day_plan, monkeypatch, h, m, name, state):
+    at(monkeypatch, h, m)
+    main.get_current_lesson_name()
+    assert (main.current_lesson_name, main.current_state) == (name, state)
+
+
+def test_build_bell_events(day_plan):
+    assert main.build_bell_events(day_plan, 5) == [
+        (seconds(8), 1, '语文'),
+        (seconds(8, 40), 0, '数学'),
+        (seconds(8, 45), 3, '数学'),  # 预备铃
+        (seconds(8, 50), 1, '数学'),
+        (seconds(9, 30), 2, ''),  # 放学
+        (seconds(12), 0, '午休'),  # 休息段
+        (seconds(14), 1, '英语'),
+        (seconds(14, 45), 0, '物理'),
+        (seconds(14, 50), 3, '物理'),
+        (seconds(14, 55), 1, '物理'),
+        (seconds(15, 40), 2, ''),
+    ]
+
+
+def test_build_bell_events_prepare_outside_break(day_plan):
+    events = main.build_bell_events(day_plan, 15)  # 提前 15 分钟时不在课间内，不提醒
+    assert [e for e in events if e[1] == 3] == []
+    assert len(main.build_bell_events(day_plan, 0)) == 9
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):  # 可控的 time.time()
+    clock = Clock(1000.0)
+    monkeypatch.setattr(main.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def timer_wheel(qapp, clock, monkeypatch):
+    wheel = main.TimerWheel()
+    monkeypatch.setattr(main, 'timer_wheel', wheel)
+    yield wheel
+    wheel.timer.stop()
+
+
+def test_bell_scheduler_catch_up(timer_wheel, monkeypatch):
+    pushed = []
+    monkeypatch.setattr(main.notification, 'push_notification', lambda state, name: pushed.append((state, name)))
+    bell = main.BellScheduler()
+    now = seconds(10)
+    monkeypatch.setattr(bell, 'now_seconds', lambda: now)
+    bell.events = [(now - 120, 1, '过期'), (now - 30, 0, '补发'), (now, 3, '当前'), (now + 100, 1, '下一节')]
+    bell.times = [e[0] for e in bell.events]
+    bell.fire_due()
+    assert pushed == [(0, '补发'), (3, '当前')]  # 超过 catch_up 的提醒跳过
+    assert bell.next_index == 3
+    assert bell.job.active
+    assert bell.job.period == bell.max_delay  # 最长等待 60 秒后重新校正
+
+
+def test_bell_scheduler_replan_skips_past_events(day_plan, timer_wheel, config_file, monkeypatch):
+    main.conf.write_conf('Toast', 'prepare_minutes', '5')
+    monkeypatch.setattr(main.BellScheduler, 'now_seconds', staticmethod(lambda: seconds(8, 49) + 30))
+    bell = main.BellScheduler()
+    bell.replan()
+    assert bell.events[bell.next_index] == (seconds(8, 50), 1, '数学')
+    assert bell.job.period == pytest.approx(30)
+
+
+def test_tick_scheduler_merges_missed_seconds(timer_wheel, clock, monkeypatch):
+    fired = []
+    monkeypatch.setattr(main, 'bell_scheduler', type('Bell', (), {'fire_due': lambda self: fired.append(True)})())
+    monkeypatch.setattr(main.utils.tick_profiler, 'reporters', [])
+    ticks = []
+    scheduler = main.TickScheduler(lambda: ticks.append(clock.now))
+    assert main.utils.tick_profiler.reporters == [scheduler.summary]  # 随耗时统计输出
+    scheduler.start()
+    clock.now = 1001.01
+    scheduler.on_timeout()
+    assert not fired
+    clock.now = 1004.2  # 错过 2 秒
+    scheduler.on_timeout()
+    assert fired == [True]  # 补检提醒
+    assert ticks == [1000.0, 1001.01, 1004.2]  # 合并为一次刷新
+    stats = scheduler.stats()
+    assert stats['ticks'] == 3
+    assert stats['missed_ticks'] == 2
+    assert stats['max'] == pytest.approx(2200)
+    assert '合并 2 秒' in scheduler.summary()
+
+
+@pytest.mark.parametrize('period, phase, now, due', [
+    (1, 0, 100.3, 101),  # 对齐到下一个整秒
+    (1, 0, 100.0, 101),
+    (60, 5, 100.0, 125),  # 带相位
+    (30, None, 100.25, 130.25),  # 从注册时开始计时
+])
+def test_timer_wheel_next_due(period, phase, now, due):
+    job = main.TimerJob(None, period, phase, True, 1, None, False, 'job')
+    assert main.TimerWheel.next_due(job, now) == pytest.approx(due)
+
+
+def test_timer_wheel_runs_due_jobs_in_priority_order(timer_wheel, clock):
+    calls = []
+    timer_wheel.add(lambda: calls.append('late'), 1, phase=0, priority=1, name='late')
+    timer_wheel.add(lambda: calls.append('first'), 1, phase=0, priority=0, name='first')
+    once = timer_wheel.once(lambda: calls.append('once'), 0.5, name='once')
+    clock.now = 1001.0
+    timer_wheel.on_timeout()
+    assert calls == ['once', 'first', 'late']
+    assert not once.active
+    assert timer_wheel.wakeups == 1
+    assert timer_wheel.job_stats['first'][0] == 1
+
+
+def test_timer_wheel_merges_missed_periods(timer_wheel, clock):
+    calls = []
+    job = timer_wheel.add(lambda: calls.append(clock.now), 1, phase=0.5, name='job')
+    assert job.due == 1000.5
+    clock.now = 1003.7
+    timer_wheel.on_timeout()
+    assert calls == [1003.7]  # 错过的周期只执行一次
+    assert job.due == 1004.5  # 保持相位
+
+
+def test_timer_wheel_cancel_and_throttle(timer_wheel, clock):
+    class Owner:
+        destroyed = type('Signal', (), {'connect': lambda self, slot: None})()
+
+        def isVisible(self):
+            return False
+
+    calls = []
+    cancelled = timer_wheel.add(lambda: calls.append('cancelled'), 1, phase=0)
+    timer_wheel.add(lambda: calls.append('hidden'), 1, phase=0, owner=Owner(), throttle=True)
+    timer_wheel.cancel(cancelled)
+    clock.now = 1001.0
+    timer_wheel.on_timeout()
+    assert calls == []
+
+
+def test_timer_wheel_realigns_after_clock_change(timer_wheel, clock):
+    calls = []
+    job = timer_wheel.add(lambda: calls.append(clock.now), 1, phase=0)
+    once = timer_wheel.once(lambda: calls.append('once'), 10)
+    clock.now = 500.2  # 系统时间被调回
+    timer_wheel.on_timeout()
+    assert calls == []
+    assert job.due == 501
+    assert once.due == pytest.approx(510.2)
+
+
+def test_timer_wheel_summary(timer_wheel, clock):
+    timer_wheel.add(lambda: None, 1, phase=0, name='tick')
+    for second in (1001, 1002):
+        clock.now = second
+        timer_wheel.on_timeout()
+    summary = timer_wheel.summary()
+    assert summary.startswith('统一定时器唤醒 2 次')
+    assert 'tick 2 次' in summary
@@ -0,0 +1,108 @@
+import pytest
+import requests
+
+import network_thread
+import weather_db
+
+now_v1 = {'current': {'temperature': {'value': '18'}, 'weather': '3'}}  # 当前API（默认 xiaomi_weather）的实时天气
+now_v2 = {'current': {'temperature': {'value': '20'}, 'weather': '0'}}
+
+
+class Response:
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return self.data
+
+
+@pytest.fixture
+def weather_cache(tmp_path, monkeypatch):
+    cache = weather_db.WeatherCache(str(tmp_path / 'weather.json'))
+    monkeypatch.setattr(weather_db, 'weather_cache', cache)
+    return cache
+
+
+@pytest.fixture
+def requests_get(monkeypatch):  # 记录请求并按顺序返回预设的响应
+    calls = []
+    responses = []
+
+    def get(url, headers=None, proxies=None):
+        calls.append(headers)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(network_thread.requests, 'get', get)
+    return calls, responses
+
+
+def current_key():
+    snapshot = weather_db.conf.get_snapshot()
+    return snapshot.weather_api, snapshot.weather_city
+
+
+def test_fresh_cache_skips_request(weather_cache, requests_get):
+    calls, _ = requests_get
+    weather_cache.put(*current_key(), {'now': now_v1, 'alert': {}}, {}, 1800)
+    assert network_thread.weatherReportThread().get_weather_data() == {'now': now_v1, 'alert': {}}
+    assert calls == []
+
+
+def test_refresh_uses_conditional_request(weather_cache, requests_get):
+    calls, responses = requests_get
+    weather_cache.put(*current_key(), {'now': now_v1, 'alert': {}}, {'now': {'etag': '"v1"'}}, 1800)
+    responses.append(Response(304))
+    data = network_thread.weatherReportThread(refresh=True).get_weather_data()
+    assert data['now'] == now_v1  # 未变化，沿用缓存
+    assert calls[0] == {'If-None-Match': '"v1"'}
+    assert weather_cache.get(*current_key()).validators['now'] == {'etag': '"v1"'}
+
+
+def test_new_data_replaces_cache(weather_cache, requests_get):
+    calls, responses = requests_get
+    responses.append(Response(200, now_v2, {'ETag': '"v2"'}))
+    data = network_thread.weatherReportThread().get_weather_data()
+    assert data['now'] == now_v2
+    assert calls == [None]
+    entry = weather_cache.get(*current_key())
+    assert entry.data['now'] == now_v2
+    assert entry.validators['now'] == {'etag': '"v2"', 'last_modified': None}
+
+
+def test_request_failure_falls_back_to_cache(weather_cache, requests_get):
+    _, responses = requests_get
+    weather_cache.put(*current_key(), {'now': now_v1, 'alert': {}}, {}, 0)
+    responses.append(requests.exceptions.ConnectionError())
+    assert network_thread.weatherReportThread().get_weather_data()['now'] == now_v1
+
+    responses.append(Response(500))
+    assert network_thread.weatherReportThread().get_weather_data()['now'] == now_v1
+
+
+def test_request_failure_without_cache(weather_cache, requests_get):
+    _, responses = requests_get
+    responses.append(Response(500))
+    assert network_thread.weatherReportThread().get_weather_data() == {
+        'error': {'info': {'value': '错误', 'unit': 500}}
+    }
+
+
+@pytest.mark.parametrize('body', [
+    {'status': '0', 'info': 'INVALID_USER_KEY'},
+    {'current': {}},
+])
+def test_error_body_not_cached(weather_cache, requests_get, body):
+    _, responses = requests_get
+    responses.append(Response(200, body))
+    assert network_thread.weatherReportThread().get_weather_data() == {'error': {'info': {'value': '错误', 'unit': ''}}}
+    assert weather_cache.get(*current_key()) is None
+
+    weather_cache.put(*current_key(), {'now': now_v1, 'alert': {}}, {}, 0)
+    responses.append(Response(200, body))
+    assert network_thread.weatherReportThread().get_weather_data()['now'] == now_v1  # 沿用原有缓存
+    assert weather_cache.get(*current_key()).data['now'] == now_v1
@@ -0,0 +1,172 @@
+import os
+import sqlite3
+
+import pytest
+
+import weather_db
+
+cities = ['上海', '上海.闵行', '北京.海淀', '海口', '东海', '百分%城', '下划_线', '西安', '西安.长安', '北京']
+
+
+@pytest.fixture
+def city_index():
+    database = 'test_citys.db'
+    database_path = os.path.join(weather_db.base_directory, 'config', 'data', database)
+    conn = sqlite3.connect(database_path)
+    conn.execute('CREATE TABLE citys (_id integer primary key autoincrement, province_id integer, name text, '
+                 'city_num text)')
+    conn.executemany('INSERT INTO citys (province_id, name, city_num) VALUES (0, ?, ?)',
+                     ((name, str(101000000 + i)) for i, name in enumerate(cities)))
+    conn.commit()
+    conn.close()
+    index = weather_db.CityIndex(database)
+    yield index
+    if index.conn is not None:
+        index.conn.close()
+    os.remove(database_path)
+
+
+def test_city_search_ranking(city_index):
+    city_index.build_index()
+    assert city_index.search('上海') == ['上海', '上海.闵行']  # 全名、开头
+    assert city_index.search('海') == ['海口', '北京.海淀', '上海', '东海', '上海.闵行']  # 开头、下级地名开头、包含
+    assert city_index.search('上海.闵') == ['上海.闵行']
+    assert city_index.search('海', limit=2) == ['海口', '北京.海淀']
+    assert city_index.search('') == cities
+
+
+@pytest.mark.skipif(weather_db.lazy_pinyin is None, reason='未安装 pypinyin')
+def test_city_search_pinyin(city_index):
+    city_index.build_index()
+    assert city_index.search('xa') == ['西安', '西安.长安']  # 首字母
+    assert city_index.search('xian') == ['西安', '西安.长安']  # 全拼
+    assert city_index.search('sh')[:2] == ['上海', '上海.闵行']  # 前缀
+
+
+@pytest.mark.parametrize('indexed', [True, False])
+def test_city_search_escapes_wildcards(city_index, indexed):
+    if indexed:
+        city_index.build_index()
+    else:
+        city_index.indexing = True  # 不启动后台线程，使用 LIKE 查询
+    assert city_index.search('%') == ['百分%城']
+    assert city_index.search('_') == ['下划_线']
+    assert city_index.search('分%城') == ['百分%城']
+    assert city_index.search('\\') == []
+
+
+def test_city_search_fallback_before_index(city_index):
+    city_index.indexing = True
+    assert city_index.search('海') == ['海口', '北京.海淀', '上海', '东海', '上海.闵行']
+    assert not city_index.indexed
+
+
+def test_city_lookup(city_index):
+    assert city_index.name_of(101000001) == '上海.闵行'
+    assert city_index.code_of(' 北京 ') == '101000009'
+    assert city_index.code_of('不存在', 'default') == 'default'
+
+
+def test_weather_catalog_lookup():
+    catalog = weather_db.WeatherCatalog('qq_weather')
+    assert catalog.code('晴') == '100'
+    assert catalog.code('不存在') == '99'
+    assert catalog.description(101) == '多云'
+    assert catalog.description('-1') == '未知'
+    assert catalog.original_codes['1'][:3] == ['101', '102', '103']
+
+
+def test_weather_catalog_icons_and_backgrounds():
+    catalog = weather_db.WeatherCatalog('qq_weather')
+    assert catalog.icon('100', night=False).endswith('/img/weather/0.svg')  # 使用原始代码的图标
+    assert catalog.icon('100', night=True).endswith('/img/weather/0d.svg')
+    assert catalog.icon('-1').endswith('/img/weather/99.svg')
+    assert catalog.background('100', night=True) == 'img/weather/bkg/night.png'
+    assert catalog.background('-1', night=False) == 'img/weather/bkg/day.png'
+
+
+def test_get_catalog_cached():
+    assert weather_db.get_catalog('amap_weather') is weather_db.get_catalog('amap_weather')
+    assert weather_db.get_catalog('amap_weather').code('晴') == '0'
+
+
+def test_compile_path():
+    extract = weather_db.compile_path('result.realtime.0.infos.temperature')
+    assert extract({'result': {'realtime': [{'infos': {'temperature': 21}}]}}) == 21
+    assert extract({'result': {'realtime': []}}) is None  # 空数据
+    with pytest.raises(KeyError):
+        extract({'result': {'forecast': []}})
+
+
+@pytest.mark.parametrize('api, data, temp, icon', [
+    ('amap_weather', {'lives': [{'temperature': '25', 'weather': '晴'}]}, '25°', '0'),
+    ('qq_weather', {'result': {'realtime': [{'infos': {'temperature': 20, 'weather': '多云'}}]}}, '20°', '101'),
+    ('xiaomi_weather', {'current': {'temperature': {'value': '18'}, 'weather': '3'}}, '18°', '3'),
+])
+def test_weather_adapter(api, data, temp, icon):
+    adapter = weather_db.WeatherAdapter(api)
+    assert adapter.get('temp', data) == temp
+    assert adapter.get('icon', data) == icon
+
+
+def test_weather_adapter_errors():
+    amap = weather_db.WeatherAdapter('amap_weather')
+    assert amap.paths == {'temp': 'lives.0.temperature', 'icon': 'lives.0.weather'}
+    assert amap.get('temp', {'status': '0'}) == '错误'  # 路径不存在
+    assert amap.get('temp', {'lives': []}) is None
+    assert amap.get('alert', {}) is None  # 不支持预警
+
+    assert not amap.is_valid({'status': '0', 'info': 'INVALID_USER_KEY'})
+    assert not amap.is_valid({'lives': []})
+    assert amap.is_valid({'lives': [{'temperature': '25', 'weather': '晴'}]})
+
+    xiaomi = weather_db.WeatherAdapter('xiaomi_weather')
+    assert xiaomi.get('alert', {'alerts': [{'level': '蓝色'}]}) == '蓝色'  # 预警不使用 data_root
+
+
+@pytest.fixture
+def clock(monkeypatch):  # 可控的 time.time()
+    now = [1000.0]
+    monkeypatch.setattr(weather_db.time, 'time', lambda: now[0])
+    return now
+
+
+def test_weather_cache_ttl_and_max_age(tmp_path, clock):
+    cache = weather_db.WeatherCache(str(tmp_path / 'weather.json'))
+    assert cache.get('amap_weather', '110000') is None
+    validators = {'now': {'etag': '"abc"', 'last_modified': 'Sat, 17 Oct 2026 08:00:00 GMT'}}
+    cache.put('amap_weather', '110000', {'now': {'lives': []}, 'alert': {}}, validators, 1800)
+
+    clock[0] += 1000
+    entry = cache.get('amap_weather', '110000', max_age=3600)
+    assert entry.is_fresh()
+    assert entry.request_headers('now') == {
+        'If-None-Match': '"abc"', 'If-Modified-Since': 'Sat, 17 Oct 2026 08:00:00 GMT'
+    }
+    assert entry.request_headers('alert') == {}
+
+    clock[0] += 1000
+    assert not entry.is_fresh()  # 超过有效期，仍可用于条件请求
+    assert cache.get('amap_weather', '110000', max_age=3600) is entry
+    clock[0] += 2000
+    assert cache.get('amap_weather', '110000', max_age=3600) is None  # 超过最长保留时间
+    assert cache.get('amap_weather', '310000') is None
+
+
+def test_weather_cache_persists_and_prunes(tmp_path, clock):
+    path = str(tmp_path / 'weather.json')
+    cache = weather_db.WeatherCache(path)
+    cache.put('amap_weather', 'old', {'now': 1}, {}, 1800)
+    clock[0] += weather_db.conf.get_snapshot().weather_cache_max_age + 1
+    cache.put('amap_weather', 'new', {'now': 2}, {}, 1800)  # 保存时清理过旧的缓存
+
+    reloaded = weather_db.WeatherCache(path)
+    assert reloaded.get('amap_weather', 'new').data == {'now': 2}
+    assert reloaded.get('amap_weather', 'old') is None
+    assert not os.path.exists(f'{path}.tmp')
+
+
+def test_weather_cache_ignores_corrupt_file(tmp_path):
+    path = tmp_path / 'weather.json'
+    path.write_text('{', encoding='utf-8')
+    assert weather_db.WeatherCache(str(path)).get('amap_weather', '110000') is None
@@ -1,7 +1,9 @@
 import sys
 
 import os
-from PyQt5 import uic
+import time
+from collections import deque
+from functools import lru_cache
 from PyQt5.QtCore import Qt, QPropertyAnimation, QRect, QEasingCurve, QTimer, QPoint, pyqtProperty
 from PyQt5.QtGui import QColor, QPainter, QBrush, QPixmap
 from PyQt5.QtWidgets import QWidget, QApplication, QLabel, QFrame, QGraphicsBlurEffect
@@ -12,6 +14,7 @@ import conf
 from conf import base_directory
 import list
 from play_audio import play_audio
+from utils import load_ui
 
 # 适配高DPI缩放
 QApplication.setHighDpiScaleFactorRoundingPolicy(Qt.HighDpiScaleFactorRoundingPolicy.PassThrough)
@@ -27,146 +30,169 @@ notification_contents = {"state": None, "lesson_name": None, "title": None, "sub
 
 # 波纹效果
 normal_color = '#56CFD8'
+wave_sprite_size = 512  # 预渲染圆形贴图尺寸
+wave_sprites = {}  # 按颜色缓存的圆形贴图
 
-window_list = []  # 窗口列表
+window_list = []  # 正在显示的窗口列表
 
 
-class tip_toast(QWidget):
-    def __init__(self, pos, width, state=1, lesson_name=None, title=None, subtitle=None, content=None, icon=None, duration=2000):
+def get_window_flags(pin_on_top, bypass=False):  # 通知窗口标志
+    if pin_on_top:
+        return (
+            Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.FramelessWindowHint |
+            Qt.X11BypassWindowManagerHint  # 绕过窗口管理器以在全屏显示通知
+        )
+    flags = Qt.WindowType.WindowStaysOnBottomHint | Qt.WindowType.FramelessWindowHint
+    if bypass:
+        flags |= Qt.X11BypassWindowManagerHint
+    return flags
+
+
+class tip_toast(QWidget):  # 通知窗口（由 window_pool 创建并复用，每次通知时重新设置内容）
+    def __init__(self):
         super().__init__()
-        uic.loadUi(f"{base_directory}/view/widget-toast-bar.ui", self)
-
-        # 窗口位置
-        if conf.read_conf('Toast', 'pin_on_top') == '1':
-            self.setWindowFlags(
-                Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.FramelessWindowHint |
-                Qt.X11BypassWindowManagerHint  # 绕过窗口管理器以在全屏显示通知
-            )
-        else:
-            self.setWindowFlags(
-                Qt.WindowType.WindowStaysOnBottomHint | Qt.WindowType.FramelessWindowHint
-            )
+        load_ui(f"{base_directory}/view/widget-toast-bar.ui", self)
+        self.pin_on_top = None
+        self.set_pin_on_top(conf.get_snapshot().toast_pin_on_top)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-        self.move(pos[0], pos[1])
-        self.resize(width, height)
 
         # 标题
-        title_label = self.findChild(QLabel, 'title')
-        backgnd = self.findChild(QFrame, 'backgnd')
-        lesson = self.findChild(QLabel, 'lesson')
-        subtitle_label = self.findChild(QLabel, 'subtitle')
-        icon_label = self.findChild(QLabel, 'icon')
+        self.title_label = self.findChild(QLabel, 'title')
+        self.backgnd = self.findChild(QFrame, 'backgnd')
+        self.lesson = self.findChild(QLabel, 'lesson')
+        self.subtitle_label = self.findChild(QLabel, 'subtitle')
+        self.icon_label = self.findChild(QLabel, 'icon')
+        default_icon = self.icon_label.pixmap()
+        self.default_icon = None if default_icon is None or default_icon.isNull() else QPixmap(default_icon)  # 复用时恢复默认图标
+        self.style_key = None
+
+        # 模糊效果（始终安装，按设置启用）
+        self.blur_effect = QGraphicsBlurEffect(self)
+        self.backgnd.setGraphicsEffect(self.blur_effect)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.close_window)
+
+        # 放大效果
+        self.geometry_animation = QPropertyAnimation(self, b"geometry")
+        self.geometry_animation.setDuration(750)  # 动画持续时间
+        self.geometry_animation.setEasingCurve(QEasingCurve.Type.OutCirc)
+        self.geometry_animation.finished.connect(self.timer.start)
+
+        self.blur_animation = QPropertyAnimation(self.blur_effect, b"blurRadius")
+        self.blur_animation.setDuration(550)
+        self.blur_animation.setStartValue(25)
+        self.blur_animation.setEndValue(0)
+
+        # 渐显
+        self.opacity_animation = QPropertyAnimation(self, b"windowOpacity")
+        self.opacity_animation.setDuration(450)
+        self.opacity_animation.setStartValue(0)
+        self.opacity_animation.setEndValue(1)
+
+        # 关闭动画
+        self.geometry_animation_close = QPropertyAnimation(self, b"geometry")
+        self.geometry_animation_close.setDuration(400)  # 动画持续时间
+        self.geometry_animation_close.setEasingCurve(QEasingCurve.Type.InOutCirc)
+
+        self.blur_animation_close = QPropertyAnimation(self.blur_effect, b"blurRadius")
+        self.blur_animation_close.setDuration(450)
+        self.blur_animation_close.setStartValue(0)
+        self.blur_animation_close.setEndValue(30)
+
+        self.opacity_animation_close = QPropertyAnimation(self, b"windowOpacity")
+        self.opacity_animation_close.setDuration(400)
+        self.opacity_animation_close.setStartValue(1)
+        self.opacity_animation_close.setEndValue(0)
+        self.opacity_animation_close.finished.connect(self.close)
+
+    def set_pin_on_top(self, pin_on_top):  # 仅在置顶设置变化时重设窗口标志
+        if pin_on_top != self.pin_on_top:
+            self.pin_on_top = pin_on_top
+            self.setWindowFlags(get_window_flags(pin_on_top))
+
+    def show_toast(self, pos, width, state=1, lesson_name=None, title=None, subtitle=None, content=None, icon=None,
+                   duration=2000):
+        snapshot = conf.get_snapshot()
+        self.set_pin_on_top(snapshot.toast_pin_on_top)
+        self.move(pos[0], pos[1])
+        self.resize(width, height)
 
         if icon:
             pixmap = QPixmap(icon)
             pixmap = pixmap.scaled(48, 48)
-            icon_label.setPixmap(pixmap)
+            self.icon_label.setPixmap(pixmap)
+        elif self.default_icon:
+            self.icon_label.setPixmap(self.default_icon)
+        self.subtitle_label.show()
 
         if state == 1:
             logger.info('上课铃声显示')
-            title_label.setText('活动开始')  # 修正文本，以适应不同场景
-            subtitle_label.setText('当前课程')
-            lesson.setText(lesson_name)  # 课程名
+            self.title_label.setText('活动开始')  # 修正文本，以适应不同场景
+            self.subtitle_label.setText('当前课程')
+            self.lesson.setText(lesson_name)  # 课程名
             playsound(attend_class)
-            setThemeColor(f"#{conf.read_conf('Color', 'attend_class')}")  # 主题色
+            setThemeColor(attend_class_color)  # 主题色
         elif state == 0:
             logger.info('下课铃声显示')
-            title_label.setText('下课')
+            self.title_label.setText('下课')
             if lesson_name:
-                subtitle_label.setText('即将进行')
+                self.subtitle_label.setText('即将进行')
             else:
-                subtitle_label.hide()
-            lesson.setText(lesson_name)  # 课程名
+                self.subtitle_label.hide()
+            self.lesson.setText(lesson_name)  # 课程名
             playsound(finish_class)
-            setThemeColor(f"#{conf.read_conf('Color', 'finish_class')}")
+            setThemeColor(finish_class_color)
         elif state == 2:
             logger.info('放学铃声显示')
-            title_label.setText('放学')
-            subtitle_label.setText('当前课程已结束')
-            lesson.setText('')  # 课程名
+            self.title_label.setText('放学')
+            self.subtitle_label.setText('当前课程已结束')
+            self.lesson.setText('')  # 课程名
             playsound(finish_class)
-            setThemeColor(f"#{conf.read_conf('Color', 'finish_class')}")
+            setThemeColor(finish_class_color)
         elif state == 3:
             logger.info('预备铃声显示')
-            title_label.setText('即将开始')  # 同上
-            subtitle_label.setText('下一节')
-            lesson.setText(lesson_name)
+            self.title_label.setText('即将开始')  # 同上
+            self.subtitle_label.setText('下一节')
+            self.lesson.setText(lesson_name)
             playsound(prepare_class)
-            setThemeColor(f"#{conf.read_conf('Color', 'prepare_class')}")
+            setThemeColor(prepare_class_color)
         elif state == 4:
             logger.info(f'通知显示: {title}')
-            title_label.setText(title)
-            subtitle_label.setText(subtitle)
-            lesson.setText(content)
+            self.title_label.setText(title)
+            self.subtitle_label.setText(subtitle)
+            self.lesson.setText(content)
             playsound(prepare_class)
 
-        # 设置样式表
-        if state == 1:  # 上课铃声
-            bg_color = [  # 1为正常、2为渐变亮色部分、3为渐变暗色部分
-                generate_gradient_color(attend_class_color)[0],
-                generate_gradient_color(attend_class_color)[1],
-                generate_gradient_color(attend_class_color)[2]
-            ]
-        elif state == 0 or state == 2:  # 下课铃声
-            bg_color = [
-                generate_gradient_color(finish_class_color)[0],
-                generate_gradient_color(finish_class_color)[1],
-                generate_gradient_color(finish_class_color)[2]
-            ]
-        elif state == 3:  # 预备铃声
-            bg_color = [
-                generate_gradient_color(prepare_class_color)[0],
-                generate_gradient_color(prepare_class_color)[1],
-                generate_gradient_color(prepare_class_color)[2]
-            ]
-        elif state == 4:  # 通知铃声
-            bg_color = ['rgba(110, 190, 210, 255)', 'rgba(110, 190, 210, 255)', 'rgba(90, 210, 215, 255)']
-        else:
-            bg_color = ['rgba(110, 190, 210, 255)', 'rgba(110, 190, 210, 255)', 'rgba(90, 210, 215, 255)']
-
-        backgnd.setStyleSheet(f'font-weight: bold; border-radius: {radius}; '
-                              'background-color: qlineargradient('
-                              'spread:pad, x1:0, y1:0, x2:1, y2:1,'
-                              f' stop:0 {bg_color[1]}, stop:0.5 {bg_color[0]}, stop:1 {bg_color[2]}'
-                              ');'
-                              )
+        # 设置样式表（颜色与圆角未变化时跳过）
+        bg_color = get_toast_colors(state)  # 1为正常、2为渐变亮色部分、3为渐变暗色部分
+        if (bg_color, radius) != self.style_key:
+            self.style_key = (bg_color, radius)
+            self.backgnd.setStyleSheet(f'font-weight: bold; border-radius: {radius}; '
+                                       'background-color: qlineargradient('
+                                       'spread:pad, x1:0, y1:0, x2:1, y2:1,'
+                                       f' stop:0 {bg_color[1]}, stop:0.5 {bg_color[0]}, stop:1 {bg_color[2]}'
+                                       ');'
+                                       )
 
         # 模糊效果
-        self.blur_effect = QGraphicsBlurEffect(self)
-        if conf.read_conf('Toast', 'wave') == '1':
-            backgnd.setGraphicsEffect(self.blur_effect)
+        self.blur_effect.setEnabled(snapshot.toast_wave)
+        self.blur_effect.setBlurRadius(0)
 
         # 设置窗口初始大小
         mini_size_x = 150
         mini_size_y = 50
 
-        self.timer = QTimer(self)
-        self.timer.setSingleShot(True)
         self.timer.setInterval(duration)
-        self.timer.timeout.connect(self.close_window)
-
-        # 放大效果
-        self.geometry_animation = QPropertyAnimation(self, b"geometry")
-        self.geometry_animation.setDuration(750)  # 动画持续时间
         self.geometry_animation.setStartValue(
             QRect(int(start_x + mini_size_x / 2), int(start_y + mini_size_y / 2),
                   total_width - mini_size_x, height - mini_size_y)
         )
         self.geometry_animation.setEndValue(QRect(start_x, start_y, total_width, height))
-        self.geometry_animation.setEasingCurve(QEasingCurve.Type.OutCirc)
-        self.geometry_animation.finished.connect(self.timer.start)
-
-        self.blur_animation = QPropertyAnimation(self.blur_effect, b"blurRadius")
-        self.blur_animation.setDuration(550)
-        self.blur_animation.setStartValue(25)
-        self.blur_animation.setEndValue(0)
-
-        # 渐显
-        self.opacity_animation = QPropertyAnimation(self, b"windowOpacity")
-        self.opacity_animation.setDuration(450)
-        self.opacity_animation.setStartValue(0)
-        self.opacity_animation.setEndValue(1)
 
+        self.setWindowOpacity(0)
+        self.show()
         self.geometry_animation.start()
         self.opacity_animation.start()
         self.blur_animation.start()
@@ -174,122 +200,190 @@ class tip_toast(QWidget):
     def close_window(self):
         mini_size_x = 120
         mini_size_y = 20
-        # 放大效果
-        self.geometry_animation_close = QPropertyAnimation(self, b"geometry")
-        self.geometry_animation_close.setDuration(400)  # 动画持续时间
+        # 缩小效果
         self.geometry_animation_close.setStartValue(QRect(start_x, start_y, total_width, height))
         self.geometry_animation_close.setEndValue(
             QRect(int(start_x + mini_size_x / 2), int(start_y + mini_size_y / 2),
                   total_width - mini_size_x, height - mini_size_y))
-        self.geometry_animation_close.setEasingCurve(QEasingCurve.Type.InOutCirc)
-
-        self.blur_animation_close = QPropertyAnimation(self.blur_effect, b"blurRadius")
-        self.blur_animation_close.setDuration(450)
-        self.blur_animation_close.setStartValue(0)
-        self.blur_animation_close.setEndValue(30)
-
-        self.opacity_animation_close = QPropertyAnimation(self, b"windowOpacity")
-        self.opacity_animation_close.setDuration(400)
-        self.opacity_animation_close.setStartValue(1)
-        self.opacity_animation_close.setEndValue(0)
 
         self.geometry_animation_close.start()
         self.opacity_animation_close.start()
         self.blur_animation_close.start()
-        self.opacity_animation_close.finished.connect(self.close)
 
     def closeEvent(self, event):
-        global window_list
-        # window_list.remove(self)
+        self.timer.stop()
         self.hide()
-        self.deleteLater()
         event.ignore()
+        window_pool.release(self)  # 回收窗口，而非销毁
 
 
-class wave_Effect(QWidget):
-    def __init__(self, state=1):
-        super().__init__()
+class wave_Effect(QWidget):  # 波纹窗口（由 window_pool 创建并复用）
+    frame_budget = 0.05  # 单帧耗时上限（秒），持续超出则改用简化效果
+    retry_after = 10  # 使用简化效果若干次后重新尝试完整效果（负载可能已经下降）
+    lite = False  # 简化效果：不逐帧绘制扩散的圆，仅整体淡出
+    lite_shown = 0  # 切换为简化效果后已显示的次数
 
-        if conf.read_conf('Toast', 'pin_on_top') == '1':
-            self.setWindowFlags(
-                Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.FramelessWindowHint |
-                Qt.X11BypassWindowManagerHint  # 绕过窗口管理器以在全屏显示通知
-            )
-        else:
-            self.setWindowFlags(
-                Qt.WindowType.WindowStaysOnBottomHint | Qt.WindowType.FramelessWindowHint |
-                Qt.X11BypassWindowManagerHint  # 绕过窗口管理器以在全屏显示通知
-            )
+    def __init__(self):
+        super().__init__()
+        self.pin_on_top = None
+        self.set_pin_on_top(conf.get_snapshot().toast_pin_on_top)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
 
         self._radius = 0
         self.duration = 1150
-
-        if state == 1:
-            self.color = QColor(attend_class_color)
-        elif state == 0 or state == 2:
-            self.color = QColor(finish_class_color)
-        elif state == 3:
-            self.color = QColor(prepare_class_color)
-        elif state == 4:
-            self.color = QColor(normal_color)
-        else:
-            self.color = QColor(normal_color)
-
-        screen_geometry = QApplication.primaryScreen().geometry()
-        self.setGeometry(screen_geometry)
+        self.color = QColor(normal_color)
+        self.sprite = None
+        self.last_frame = None
+        self.frame_times = deque(maxlen=8)  # 最近几帧的间隔
 
         self.timer = QTimer(self)
         self.timer.setSingleShot(True)
         self.timer.setInterval(275)
         self.timer.timeout.connect(self.showAnimation)
-        self.timer.start()
-
-    @pyqtProperty(int)
-    def radius(self):
-        return self._radius
-
-    @radius.setter
-    def radius(self, value):
-        self._radius = value
-        self.update()
 
-    def showAnimation(self):
         self.animation = QPropertyAnimation(self, b'radius')
         self.animation.setDuration(self.duration)
         self.animation.setStartValue(50)
-        self.animation.setEndValue(max(self.width(), self.height()) * 1.7)
         self.animation.setEasingCurve(QEasingCurve.Type.InOutCirc)
-        self.animation.start()
 
         self.fade_animation = QPropertyAnimation(self, b'windowOpacity')
         self.fade_animation.setDuration(self.duration - self.duration // 5)
-
         self.fade_animation.setKeyValues([  # 关键帧
             (0, 0),
             (0.06, 0.9),
             (1, 0)
         ])
-
         self.fade_animation.setEasingCurve(QEasingCurve.Type.InOutCirc)
         self.fade_animation.finished.connect(self.close)
+
+    def set_pin_on_top(self, pin_on_top):
+        if pin_on_top != self.pin_on_top:
+            self.pin_on_top = pin_on_top
+            self.setWindowFlags(get_window_flags(pin_on_top, bypass=True))
+
+    def show_wave(self, state=1):
+        self.set_pin_on_top(conf.get_snapshot().toast_pin_on_top)
+        self.color = QColor(get_state_color(state))
+        self.sprite = get_wave_sprite(self.color.name())
+        self._radius = 0
+        self.last_frame = None
+        self.frame_times.clear()
+
+        screen_geometry = QApplication.primaryScreen().geometry()
+        self.setGeometry(screen_geometry)
+        self.setWindowOpacity(1)
+        self.show()
+        self.timer.start()
+
+    @pyqtProperty(int)
+    def radius(self):
+        return self._radius
+
+    @radius.setter
+    def radius(self, value):
+        self._radius = value
+        self.update(self.circle_rect().intersected(self.rect()))  # 圆只会变大，仅重绘其外接矩形
+        self.measure_frame()
+
+    def wave_center(self):
+        return QPoint(self.rect().center().x(), self.rect().top() + start_y + 50)
+
+    def circle_rect(self):  # 圆的外接矩形
+        center = self.wave_center()
+        return QRect(center.x() - self._radius, center.y() - self._radius, self._radius * 2, self._radius * 2)
+
+    def covers_window(self):  # 圆是否已覆盖整个窗口
+        center = self.wave_center()
+        rect = self.rect()
+        dx = max(center.x() - rect.left(), rect.right() - center.x())
+        dy = max(center.y() - rect.top(), rect.bottom() - center.y())
+        return dx * dx + dy * dy <= self._radius * self._radius
+
+    def measure_frame(self):  # 统计帧间隔，持续超出预算时切换为简化效果
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            self.frame_times.append(now - self.last_frame)
+        self.last_frame = now
+        if wave_Effect.lite or len(self.frame_times) < self.frame_times.maxlen:
+            return
+        average = sum(self.frame_times) / len(self.frame_times)
+        if average > self.frame_budget:
+            wave_Effect.lite = True
+            wave_Effect.lite_shown = 0
+            logger.warning(f'波纹动画帧耗时过长（平均 {average * 1000:.0f} ms），已切换为简化效果')
+            self.animation.stop()
+            self.show_lite()
+
+    def show_lite(self):  # 简化效果：一次绘制整个窗口，之后只改变窗口透明度
+        self._radius = int(self.animation.endValue())
+        self.update()
+
+    def showAnimation(self):
+        self.animation.setEndValue(int(max(self.width(), self.height()) * 1.7))
+        if wave_Effect.lite and wave_Effect.lite_shown >= self.retry_after:
+            wave_Effect.lite = False
+            logger.info('重新尝试完整波纹效果')
+        if wave_Effect.lite:
+            wave_Effect.lite_shown += 1
+            self.show_lite()
+        else:
+            self.animation.start()
         self.fade_animation.start()
 
     def paintEvent(self, event):
+        if self._radius <= 0:
+            return
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        painter.setBrush(QBrush(self.color))
-        painter.setPen(Qt.PenStyle.NoPen)
-        center = self.rect().center()
-        loc = QPoint(center.x(), self.rect().top() + start_y + 50)
-        painter.drawEllipse(loc, self._radius, self._radius)
+        if self.covers_window():
+            painter.fillRect(event.rect(), self.color)
+            return
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.drawPixmap(self.circle_rect(), self.sprite)  # 缩放预渲染的圆形贴图
 
     def closeEvent(self, event):
-        global window_list
-        # window_list.remove(self)
-        self.deleteLater()
+        self.timer.stop()
+        self.animation.stop()
         self.hide()
         event.ignore()
+        window_pool.release(self)
+
+
+class WindowPool:  # 通知窗口池：空闲时预先创建，关闭后回收复用
+    def __init__(self, size=1):
+        self.size = size  # 每种窗口保留的空闲数量
+        self.idle = {tip_toast: [], wave_Effect: []}
+
+    def warm_up(self):  # 预先创建窗口并计算渐变色
+        snapshot = conf.get_snapshot()
+        for color in (snapshot.attend_class_color, snapshot.finish_class_color, snapshot.prepare_class_color):
+            generate_gradient_color(color)
+            get_wave_sprite(QColor(color).name())
+        try:
+            for window_type, windows in self.idle.items():
+                while len(windows) < self.size:
+                    windows.append(window_type())
+        except Exception as e:
+            logger.error(f'预创建通知窗口失败：{e}')
+
+    def acquire(self, window_type):
+        windows = self.idle[window_type]
+        window = windows.pop() if windows else window_type()
+        window_list.append(window)
+        return window
+
+    def release(self, window):
+        if window in window_list:
+            window_list.remove(window)
+        windows = self.idle[type(window)]
+        if window in windows:
+            return
+        if len(windows) < self.size:
+            windows.append(window)
+        else:  # 同时显示多个通知时多出的窗口
+            window.deleteLater()
+
+
+window_pool = WindowPool()
 
 
 def playsound(filename):
@@ -300,7 +394,8 @@ def playsound(filename):
         logger.error(f'播放音频文件失败：{e}')
 
 
-def generate_gradient_color(theme_color):  # 计算渐变色
+@lru_cache(maxsize=16)
+def generate_gradient_color(theme_color):  # 计算渐变色（按颜色缓存）
     def adjust_color(color, factor):
         r = max(0, min(255, int(color.red() * (1 + factor))))
         g = max(0, min(255, int(color.green() * (1 + factor))))
@@ -309,10 +404,41 @@ def generate_gradient_color(theme_color):  # 计算渐变色
         return f'rgba({r}, {g}, {b}, 255)'
 
     color = QColor(theme_color)
-    gradient = [adjust_color(color, 0), adjust_color(color, 0.24), adjust_color(color, -0.11)]
+    gradient = (adjust_color(color, 0), adjust_color(color, 0.24), adjust_color(color, -0.11))
     return gradient
 
 
+def get_wave_sprite(color):  # 获取（必要时预渲染）指定颜色的圆形贴图
+    sprite = wave_sprites.get(color)
+    if sprite is None:
+        sprite = QPixmap(wave_sprite_size, wave_sprite_size)
+        sprite.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(sprite)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setBrush(QBrush(QColor(color)))
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.drawEllipse(0, 0, wave_sprite_size, wave_sprite_size)
+        painter.end()
+        wave_sprites[color] = sprite
+    return sprite
+
+
+def get_state_color(state):  # 通知状态对应的颜色
+    if state == 1:  # 上课铃声
+        return attend_class_color
+    elif state == 0 or state == 2:  # 下课铃声
+        return finish_class_color
+    elif state == 3:  # 预备铃声
+        return prepare_class_color
+    return normal_color
+
+
+def get_toast_colors(state):
+    if state in (0, 1, 2, 3):
+        return generate_gradient_color(get_state_color(state))
+    return 'rgba(110, 190, 210, 255)', 'rgba(110, 190, 210, 255)', 'rgba(90, 210, 215, 255)'  # 通知铃声
+
+
 def main(state=1, lesson_name='', title='通知示例', subtitle='副标题',
          content='这是一条通知示例', icon=None, duration=2000):  # 0:下课铃声 1:上课铃声 2:放学铃声 3:预备铃 4:其他
     if detect_enable_toast(state):
@@ -325,22 +451,24 @@ def main(state=1, lesson_name='', title='通知示例', subtitle='副标题',
         if widget not in list.widget_name:
             widgets.remove(widget)  # 移除不存在的组件(确保移除插件后不会出错)
 
-    attend_class_color = f"#{conf.read_conf('Color', 'attend_class')}"
-    finish_class_color = f"#{conf.read_conf('Color', 'finish_class')}"
-    prepare_class_color = f"#{conf.read_conf('Color', 'prepare_class')}"
+    snapshot = conf.get_snapshot()
+    attend_class_color = snapshot.attend_class_color
+    finish_class_color = snapshot.finish_class_color
+    prepare_class_color = snapshot.prepare_class_color
 
-    theme = conf.read_conf('General', 'theme')
-    height = conf.load_theme_config(theme)['height']
-    radius = conf.load_theme_config(theme)['radius']
+    theme = snapshot.theme
+    theme_config = conf.theme_registry.get(theme)
+    height = theme_config.height
+    radius = theme_config.radius
 
     screen_geometry = QApplication.primaryScreen().geometry()
     screen_width = screen_geometry.width()
-    spacing = conf.load_theme_config(theme)['spacing']
+    spacing = theme_config.spacing
 
     widgets_width = 0
     for widget in widgets:  # 计算总宽度(兼容插件)
         try:
-            widgets_width += conf.load_theme_width(theme)[widget]
+            widgets_width += theme_config.widget_width[widget]
         except KeyError:
             widgets_width += list.widget_width[widget]
         except:
@@ -349,12 +477,13 @@ def main(state=1, lesson_name='', title='通知示例', subtitle='副标题',
     total_width = widgets_width + spacing * (len(widgets) - 1)
 
     start_x = int((screen_width - total_width) / 2)
-    start_y = int(conf.read_conf('General', 'margin'))
+    start_y = snapshot.margin
 
+    window = window_pool.acquire(tip_toast)
     if state != 4:
-        window = tip_toast((start_x, start_y), total_width, state, lesson_name, duration=duration)
+        window.show_toast((start_x, start_y), total_width, state, lesson_name, duration=duration)
     else:
-        window = tip_toast(
+        window.show_toast(
             (start_x, start_y),
             total_width, state,
             '',
@@ -365,21 +494,18 @@ def main(state=1, lesson_name='', title='通知示例', subtitle='副标题',
             duration=duration
         )
 
-    window.show()
-    window_list.append(window)
-
-    if conf.read_conf('Toast', 'wave') == '1':
-        wave = wave_Effect(state)
-        wave.show()
-        window_list.append(wave)
+    if snapshot.toast_wave:
+        wave = window_pool.acquire(wave_Effect)
+        wave.show_wave(state)
 
 
 def detect_enable_toast(state=0):
-    if conf.read_conf('Toast', 'attend_class') != '1' and state == 1:
+    snapshot = conf.get_snapshot()
+    if not snapshot.toast_attend_class and state == 1:
         return True
-    if conf.read_conf('Toast', 'finish_class') != '1' and state == 0 or state == 2:
+    if not snapshot.toast_finish_class and state == 0 or state == 2:
         return True
-    if conf.read_conf('Toast', 'prepare_class') != '1' and state == 3:
+    if not snapshot.toast_prepare_class and state == 3:
         return True
     else:
         return False
@@ -1,12 +1,21 @@
+import hashlib
+import io
 import os
 import sys
+import time
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+from xml.etree import ElementTree
 
-from PyQt5.QtGui import QIcon
+from PyQt5.QtGui import QIcon, QPixmap, QPainter, QColor
+from PyQt5.QtSvg import QSvgRenderer
 from PyQt5.QtWidgets import QSystemTrayIcon, QApplication
 from loguru import logger
-from PyQt5.QtCore import QSharedMemory
+from PyQt5 import uic, QtWidgets
+from PyQt5.QtCore import Qt, QRectF, QSharedMemory, QObject, QFileSystemWatcher, QTimer, pyqtSignal
 
-from file import base_directory
+import list as list_
+from file import base_directory, path, get_snapshot, invalidate_conf, theme_registry
 
 share = QSharedMemory('ClassWidgets')
 
@@ -29,6 +38,243 @@ def calculate_size(p_w=0.6, p_h=0.7):  # 计算尺寸
 
 
 tray_icon = None
+config_watcher = None
+
+
+class ViewModel:  # 记录上次渲染的值，只在变化时更新控件（避免每秒重绘/重新应用样式）
+    _unset = object()
+
+    def __init__(self):
+        self.rendered = {}
+
+    def changed(self, widget, prop, value):  # 值有变化时记录并返回 True
+        key = (id(widget), prop)
+        if self.rendered.get(key, self._unset) == value:
+            return False
+        self.rendered[key] = value
+        return True
+
+    def set_text(self, widget, text):
+        if self.changed(widget, 'text', text):
+            widget.setText(text)
+
+    def set_style_sheet(self, widget, style_sheet):
+        if self.changed(widget, 'styleSheet', style_sheet):
+            widget.setStyleSheet(style_sheet)
+
+    def set_value(self, widget, value):
+        if self.changed(widget, 'value', value):
+            widget.setValue(value)
+
+    def set_window_opacity(self, widget, opacity):
+        if self.changed(widget, 'windowOpacity', opacity):
+            widget.setWindowOpacity(opacity)
+
+    def set_icon(self, widget, key, create_icon):  # key 变化时才调用 create_icon() 生成图标
+        if self.changed(widget, 'icon', key):
+            widget.setIcon(create_icon())
+
+    def invalidate(self, widget=None, prop=None):  # 控件属性被外部修改后调用
+        if widget is None:
+            self.rendered.clear()
+        elif prop is None:
+            for key in [k for k in self.rendered if k[0] == id(widget)]:
+                del self.rendered[key]
+        else:
+            self.rendered.pop((id(widget), prop), None)
+
+
+def render_svg(file_path, device_pixel_ratio=1.0, tint=None):  # 渲染SVG图标，可选着色
+    render = QSvgRenderer(file_path)
+    size = render.defaultSize()
+    pixmap = QPixmap(size * device_pixel_ratio)
+    pixmap.setDevicePixelRatio(device_pixel_ratio)
+    pixmap.fill(Qt.GlobalColor.transparent)
+
+    painter = QPainter(pixmap)
+    rect = QRectF(0, 0, size.width(), size.height())
+    render.render(painter, rect)
+    if tint is not None:
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceIn)
+        painter.fillRect(rect, QColor(tint))
+    painter.end()
+    return pixmap
+
+
+class PixmapCache:  # 渲染好的图标缓存，超出容量时淘汰最久未使用的
+    def __init__(self, max_size=32):
+        self.max_size = max_size
+        self.pixmaps = OrderedDict()
+
+    def get(self, file_path, dark=False, device_pixel_ratio=1.0, tint=None):
+        key = (file_path, dark, device_pixel_ratio, tint)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(key)
+            return pixmap
+        pixmap = render_svg(file_path, device_pixel_ratio, tint)
+        self.pixmaps[key] = pixmap
+        if len(self.pixmaps) > self.max_size:
+            self.pixmaps.popitem(last=False)
+        return pixmap
+
+    def clear(self):
+        self.pixmaps.clear()
+
+
+subject_icon_cache = PixmapCache()  # 课程图标
+
+
+def percentile(sorted_values, q):  # 已排序样本的分位数（最近秩法）
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class ProfileSection:  # 计时区段（with 语句）
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.record(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class TickProfiler:  # 每秒刷新的耗时统计（使用 --profile-ticks 启动时启用）
+    def __init__(self, size=300, dump_interval=60):
+        self.enabled = False
+        self.size = size  # 每项保留的最近样本数
+        self.dump_interval = dump_interval  # 每隔多少次刷新输出一次统计
+        self.samples = {}  # 区段名 -> 最近的耗时（毫秒）
+        self.reporters = []  # 附加统计：返回一行文本的函数，随统计一同输出
+        self.ticks = 0
+        self.idle = nullcontext()
+
+    def measure(self, name):  # 未启用时返回空上下文，开销可忽略
+        if not self.enabled:
+            return self.idle
+        return ProfileSection(self, name)
+
+    def record(self, name, elapsed):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.size)
+        samples.append(elapsed)
+
+    def end_tick(self):
+        if not self.enabled:
+            return
+        self.ticks += 1
+        if self.ticks % self.dump_interval == 0:
+            self.dump()
+
+    def stats(self):  # 区段名 -> (样本数, p50, p95, p99, 最大值)
+        result = {}
+        for name, samples in self.samples.items():
+            values = sorted(samples)
+            if not values:
+                continue
+            result[name] = (len(values), *(percentile(values, q) for q in (0.5, 0.95, 0.99)), values[-1])
+        return result
+
+    def dump(self):
+        stats = self.stats()
+        lines = [f'刷新耗时统计（最近 {self.size} 次，单位 ms）：',
+                 f'{"区段":<36}{"次数":>6}{"p50":>9}{"p95":>9}{"p99":>9}{"max":>9}']
+        for name, (count, p50, p95, p99, max_) in sorted(stats.items(), key=lambda item: -item[1][2]):
+            lines.append(f'{name:<36}{count:>6}{p50:>9.2f}{p95:>9.2f}{p99:>9.2f}{max_:>9.2f}')
+        lines.extend(reporter() for reporter in self.reporters)
+        logger.info('\n'.join(lines))
+
+
+tick_profiler = TickProfiler()
+
+
+# 界面文件缓存（.ui 编译为 Python 代码，代替每次构建窗口时解析 XML）
+ui_cache_directory = f'{base_directory}/cache/ui'
+ui_image_tags = (
+    'pixmap', 'iconset', 'normaloff', 'normalon', 'disabledoff', 'disabledon', 'activeoff', 'activeon',
+    'selectedoff', 'selectedon',
+)
+_ui_forms = {}  # .ui 路径 -> (文件状态, 顶层控件类名, 编译结果命名空间)
+
+
+def _compile_ui(ui_path):  # 编译 .ui 文件，结果缓存到 cache/ui（以 .ui 内容与缓存代码的 md5 校验）
+    name = os.path.splitext(os.path.basename(ui_path))[0]
+    digest = hashlib.md5(ui_path.encode('utf-8')).hexdigest()[:12]
+    cache_path = f'{ui_cache_directory}/{name}-{digest}.py'
+    with open(ui_path, 'rb') as file:
+        ui_data = file.read()
+    ui_digest = hashlib.md5(ui_data).hexdigest()
+
+    source = None
+    try:  # 首行：# .ui 的md5 代码的md5 顶层控件类名
+        with open(cache_path, 'r', encoding='utf-8') as file:
+            source = file.read()
+        header, body = source.split('\n', 1)
+        _, cached_ui_digest, body_digest, widget_class = header.split(' ')
+        if cached_ui_digest != ui_digest or body_digest != hashlib.md5(body.encode('utf-8')).hexdigest():
+            source = None
+    except (OSError, ValueError):
+        source = None
+
+    if source is None:
+        tree = ElementTree.parse(io.BytesIO(ui_data))
+        ui_directory = os.path.dirname(ui_path)
+        for element in tree.iter():  # 相对图片路径以 .ui 所在目录为准（与 uic.loadUi 一致）
+            text = (element.text or '').strip()
+            if element.tag in ui_image_tags and text and not text.startswith(':'):
+                element.text = os.path.join(ui_directory, text)
+        widget_class = tree.getroot().find('widget').get('class')
+
+        ui_file = io.BytesIO()
+        tree.write(ui_file, encoding='utf-8')
+        ui_file.seek(0)
+        py_file = io.StringIO()
+        uic.compileUi(ui_file, py_file)
+        body = py_file.getvalue()
+        source = f'# {ui_digest} {hashlib.md5(body.encode("utf-8")).hexdigest()} {widget_class}\n{body}'
+        try:
+            os.makedirs(ui_cache_directory, exist_ok=True)
+            with open(f'{cache_path}.tmp', 'w', encoding='utf-8') as file:
+                file.write(source)
+            os.replace(f'{cache_path}.tmp', cache_path)
+        except OSError as e:
+            logger.warning(f'写入界面缓存失败：{e}')
+
+    namespace = {}
+    exec(compile(source, cache_path, 'exec'), namespace)
+    return widget_class, namespace
+
+
+def load_ui(ui_path, base_instance=None):  # 代替 uic.loadUi，使用编译缓存
+    ui_path = os.path.abspath(ui_path)
+    try:
+        stat = os.stat(ui_path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        form = _ui_forms.get(ui_path)
+        if form is None or form[0] != stamp:
+            form = (stamp, *_compile_ui(ui_path))
+            _ui_forms[ui_path] = form
+        _, widget_class, namespace = form
+        form_class = next(value for key, value in namespace.items() if key.startswith('Ui_'))
+    except Exception as e:
+        logger.error(f'编译界面文件 {ui_path} 失败，直接加载：{e}')
+        return uic.loadUi(ui_path, base_instance)
+
+    if base_instance is None:
+        base_instance = (namespace.get(widget_class) or getattr(QtWidgets, widget_class))()
+    ui = form_class()
+    ui.setupUi(base_instance)
+    for key, value in vars(ui).items():  # 与 uic.loadUi 一样把子控件设为实例属性
+        setattr(base_instance, key, value)
+    return base_instance
 
 
 class TrayIcon(QSystemTrayIcon):
@@ -53,3 +299,106 @@ class TrayIcon(QSystemTrayIcon):
             QIcon(f"{base_directory}/img/logo/favicon-error.ico"),
             5000
         )
+
+
+class ConfigWatcher(QObject):  # 监听配置文件变化，代替逐秒轮询
+    themeChanged = pyqtSignal(str, int)  # 主题、颜色模式
+    widgetsChanged = pyqtSignal(object)  # 小组件列表
+    weatherCityChanged = pyqtSignal(str, str)  # 天气API、城市代码
+    scheduleFileChanged = pyqtSignal(str)  # 课程表文件名
+    bellSettingsChanged = pyqtSignal()  # 预备铃、时差偏移
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.config_path = os.path.abspath(path)
+        self.widget_path = os.path.abspath(f'{base_directory}/config/widget.json')
+        self.schedule_path = None
+        self.ui_directory = os.path.abspath(theme_registry.ui_directory)
+        self.theme_path = None
+        self.pending = set()  # 等待处理的文件
+
+        snapshot = get_snapshot()
+        self.last_theme = (snapshot.theme, snapshot.color_mode)
+        self.last_weather = (snapshot.weather_api, snapshot.weather_city, snapshot.weather_api_key)
+        self.last_schedule = snapshot.schedule
+        self.last_bell = (snapshot.prepare_minutes, snapshot.time_offset)
+        self.last_widgets = list_.get_widget_config()
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_file_changed)
+        self.watcher.directoryChanged.connect(self.on_file_changed)  # 主题文件夹增删
+
+        # 合并短时间内的多次写入；由文件事件驱动并在每次事件时重新计时，且 utils 不依赖 main 中的统一定时器，故单独持有
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(200)
+        self.debounce_timer.timeout.connect(self.dispatch)
+
+        self.set_schedule_path(snapshot.schedule)
+        self.set_theme_path(snapshot.theme)
+        self.watch_files()
+
+    def set_schedule_path(self, schedule):
+        if self.schedule_path in self.watcher.files():
+            self.watcher.removePath(self.schedule_path)
+        self.schedule_path = os.path.abspath(f'{base_directory}/config/schedule/{schedule}')
+
+    def set_theme_path(self, theme):
+        if self.theme_path in self.watcher.files():
+            self.watcher.removePath(self.theme_path)
+        self.theme_path = os.path.join(self.ui_directory, theme, 'theme.json')
+
+    def watch_files(self):  # 文件被替换（如原子写入）后需要重新添加
+        watching = self.watcher.files() + self.watcher.directories()
+        for file_path in (self.config_path, self.widget_path, self.schedule_path, self.theme_path, self.ui_directory):
+            if file_path not in watching and os.path.exists(file_path):
+                self.watcher.addPath(file_path)
+
+    def on_file_changed(self, file_path):
+        self.pending.add(os.path.abspath(file_path))
+        self.debounce_timer.start()
+
+    def dispatch(self):
+        changed = self.pending
+        self.pending = set()
+        if self.config_path in changed:  # 文件状态可能未变（同一时间精度内的等长写入），强制重新解析
+            invalidate_conf()
+        snapshot = get_snapshot()  # 仅在 config.ini 变化时重新解析
+
+        if self.ui_directory in changed:  # 主题增删
+            theme_registry.invalidate()
+        elif self.theme_path in changed:  # 当前主题的 theme.json 被修改
+            theme_registry.invalidate(snapshot.theme)
+
+        theme = (snapshot.theme, snapshot.color_mode)
+        if theme != self.last_theme:
+            self.last_theme = theme
+            self.set_theme_path(snapshot.theme)
+            self.themeChanged.emit(*theme)
+        elif self.theme_path in changed:
+            self.themeChanged.emit(*theme)
+
+        weather = (snapshot.weather_api, snapshot.weather_city, snapshot.weather_api_key)
+        if weather != self.last_weather:
+            self.last_weather = weather
+            self.weatherCityChanged.emit(snapshot.weather_api, snapshot.weather_city)
+
+        bell = (snapshot.prepare_minutes, snapshot.time_offset)
+        if bell != self.last_bell:
+            self.last_bell = bell
+            self.bellSettingsChanged.emit()
+
+        if snapshot.schedule != self.last_schedule:
+            self.last_schedule = snapshot.schedule
+            self.set_schedule_path(snapshot.schedule)
+            self.scheduleFileChanged.emit(snapshot.schedule)
+        elif self.schedule_path in changed:
+            self.scheduleFileChanged.emit(snapshot.schedule)
+
+        if self.widget_path in changed:
+            widgets = list_.get_widget_config()
+            if widgets != self.last_widgets:
+                self.last_widgets = widgets
+                self.widgetsChanged.emit(widgets)
+
+        self.watch_files()
@@ -1,8 +1,18 @@
 import datetime
 import sqlite3
 import json
+import os
+import sys
+import time
+import threading
+from operator import itemgetter
 from loguru import logger
 
+try:
+    from pypinyin import lazy_pinyin, Style
+except ImportError:  # 未安装 pypinyin 时不支持拼音搜索
+    lazy_pinyin = None
+
 import conf
 from conf import base_directory
 
@@ -12,191 +22,480 @@ api_config = json.load(open(f'{base_directory}/config/data/weather_api.json', en
 
 def update_path():
     global path
-    path = f"{base_directory}/config/data/{api_config['weather_api_parameters'][conf.read_conf('Weather', 'api')]['database']}"
+    path = f"{base_directory}/config/data/{api_config['weather_api_parameters'][conf.get_snapshot().weather_api]['database']}"
+
+
+def get_pinyin_keys(name):  # 城市名（及各级地名）的全拼与首字母，用于拼音前缀搜索
+    if lazy_pinyin is None:
+        return set()
+    keys = set()
+    for segment in {name, *name.split('.')}:
+        keys.add(''.join(lazy_pinyin(segment)).lower())
+        keys.add(''.join(lazy_pinyin(segment, style=Style.FIRST_LETTER)).lower())
+    return {key for key in keys if key.isalpha() and key.isascii()}
+
+
+class CityIndex:  # 城市搜索索引：每个天气数据库保持一个连接，首次使用时在后台建立全文（trigram）与拼音索引
+    def __init__(self, database):
+        self.database = database
+        self.conn = None
+        self.fts = False  # SQLite 是否支持 trigram 分词（3.34+）
+        self.indexed = False
+        self.indexing = False  # 后台线程正在建立索引
+        self.names = None  # 城市代码 -> 城市名
+        self.codes = None  # 城市名 -> 城市代码（重名时取第一个）
+        self.lock = threading.Lock()
+
+    def open(self):
+        return sqlite3.connect(
+            f'file:{base_directory}/config/data/{self.database}?mode=ro', uri=True, check_same_thread=False
+        )
+
+    def connect(self):
+        if self.conn is None:
+            self.conn = self.open()
+        return self.conn
+
+    def start_indexing(self):  # 在后台线程建立索引（约 0.5 秒），完成前搜索使用 LIKE 查询
+        with self.lock:
+            if self.indexed or self.indexing:
+                return
+            self.indexing = True
+        threading.Thread(target=self.build_index, name=f'CityIndex-{self.database}', daemon=True).start()
+
+    def build_index(self):  # 索引建立在新连接的内存数据库中，不修改数据库文件；完成后替换当前连接
+        try:
+            conn = self.open()
+            self.create_tables(conn)
+        except Exception as e:
+            logger.error(f'建立城市索引失败：{e}')
+            with self.lock:
+                self.indexing = False
+            return
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+            self.conn = conn
+            self.indexed = True
+            self.indexing = False
+
+    def create_tables(self, conn):
+        rows = conn.execute('SELECT _id, name FROM citys').fetchall()
+        conn.execute("ATTACH DATABASE ':memory:' AS idx")
+        try:
+            conn.execute("CREATE VIRTUAL TABLE idx.city_name USING fts5(name, tokenize='trigram')")
+            self.fts = True
+        except sqlite3.OperationalError:
+            logger.warning('SQLite 不支持 trigram 分词，城市搜索使用普通索引')
+            conn.execute('CREATE TABLE idx.city_name (name TEXT)')
+        conn.executemany('INSERT INTO idx.city_name (rowid, name) VALUES (?, ?)', rows)
+
+        # 1~2 个字的片段索引（trigram 无法加速过短的输入）
+        conn.execute('CREATE TABLE idx.city_gram (gram TEXT, city INTEGER, PRIMARY KEY (gram, city)) WITHOUT ROWID')
+        conn.executemany('INSERT OR IGNORE INTO idx.city_gram VALUES (?, ?)', (
+            (name[i:i + n], _id) for _id, name in rows for n in (1, 2) for i in range(len(name) - n + 1)
+        ))
+        # 拼音/首字母前缀索引
+        conn.execute('CREATE TABLE idx.city_pinyin (key TEXT, city INTEGER, PRIMARY KEY (key, city)) WITHOUT ROWID')
+        conn.executemany('INSERT INTO idx.city_pinyin VALUES (?, ?)', (
+            (key, _id) for _id, name in rows for key in get_pinyin_keys(name)
+        ))
+        conn.commit()
+
+    def search(self, term, limit=-1):  # 按匹配程度排序：全名、开头、下级地名开头、拼音/首字母开头、包含
+        term = term.strip()
+        if not self.indexed:
+            self.start_indexing()
+        with self.lock:
+            conn = self.connect()
+            if not term:
+                return [row[0] for row in conn.execute('SELECT name FROM citys ORDER BY _id LIMIT ?', (limit,))]
+            escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            if not self.indexed:  # 索引尚未建立完成
+                return self.search_fallback(conn, term, escaped, limit)
+            if len(term) <= 2:
+                where = 'rowid IN (SELECT city FROM idx.city_gram WHERE gram = :term)'
+            elif self.fts:  # trigram 索引至少需要 3 个字符
+                where = 'city_name MATCH :match'
+            else:
+                where = "name LIKE :contains ESCAPE '\\'"
+            hits = f'''
+                SELECT rowid AS city, CASE
+                    WHEN name = :term THEN 0
+                    WHEN name LIKE :prefix ESCAPE '\\' THEN 1
+                    WHEN name LIKE :segment ESCAPE '\\' THEN 2
+                    ELSE 5
+                END AS rank FROM idx.city_name WHERE {where}
+            '''
+            if term.isalpha() and term.isascii():
+                hits += 'UNION ALL SELECT city, CASE WHEN key = :key THEN 3 ELSE 4 END FROM idx.city_pinyin ' \
+                        'WHERE key >= :key AND key < :key_end'
+            query = f'''
+                SELECT c.name FROM ({hits}) AS h JOIN citys AS c ON c._id = h.city
+                GROUP BY h.city ORDER BY min(h.rank), length(c.name), c._id LIMIT :limit
+            '''
+            params = {
+                'match': '"' + term.replace('"', '""') + '"',
+                'term': term,
+                'prefix': escaped + '%',
+                'segment': '%.' + escaped + '%',
+                'contains': '%' + escaped + '%',
+                'key': term.lower(),
+                'key_end': term.lower() + '~',  # 拼音只含小写字母，'~' 排在其后
+                'limit': limit
+            }
+            return [row[0] for row in conn.execute(query, params)]
+
+    @staticmethod
+    def search_fallback(conn, term, escaped, limit):  # 不使用索引的包含匹配（不支持拼音），排序规则同上
+        query = '''
+            SELECT name FROM citys WHERE name LIKE :contains ESCAPE '\\' ORDER BY CASE
+                WHEN name = :term THEN 0
+                WHEN name LIKE :prefix ESCAPE '\\' THEN 1
+                WHEN name LIKE :segment ESCAPE '\\' THEN 2
+                ELSE 5
+            END, length(name), _id LIMIT :limit
+        '''
+        params = {
+            'term': term,
+            'prefix': escaped + '%',
+            'segment': '%.' + escaped + '%',
+            'contains': '%' + escaped + '%',
+            'limit': limit
+        }
+        return [row[0] for row in conn.execute(query, params)]
+
+    def load_tables(self):  # 首次查询时把城市表读入内存，之后的查询不再访问数据库
+        with self.lock:
+            rows = self.connect().execute('SELECT name, city_num FROM citys ORDER BY _id').fetchall()
+        names = {}
+        codes = {}
+        for name, num in rows:
+            names.setdefault(str(num), name)
+            codes.setdefault(name, str(num))
+        self.names, self.codes = names, codes
+        logger.debug(f'已加载城市表 {self.database}：{len(rows)} 个城市，约 {self.memory_size() // 1024} KB')
+
+    def memory_size(self):  # 内存中城市表的大致占用（字节）
+        if self.names is None:
+            return 0
+        size = sys.getsizeof(self.names) + sys.getsizeof(self.codes)
+        for num, name in self.names.items():
+            size += sys.getsizeof(num) + sys.getsizeof(name)
+        return size
+
+    def name_of(self, num, default=None):  # 城市代码 -> 城市名（精确匹配）
+        if self.names is None:
+            self.load_tables()
+        return self.names.get(str(num).strip(), default)
+
+    def code_of(self, name, default=None):  # 城市名 -> 城市代码（精确匹配）
+        if self.codes is None:
+            self.load_tables()
+        return self.codes.get(name.strip(), default)
+
+
+city_indexes = {}  # 数据库文件名 -> CityIndex
+
+
+def get_city_index(api=None):  # 当前（或指定）天气API的城市索引
+    if api is None:
+        api = conf.get_snapshot().weather_api
+    database = api_config['weather_api_parameters'][api]['database']
+    index = city_indexes.get(database)
+    if index is None:
+        index = city_indexes[database] = CityIndex(database)
+    return index
 
 
 def search_by_name(search_term):
-    update_path()
-    conn = sqlite3.connect(path)
-    cursor = conn.cursor()
-
-    cursor.execute('SELECT * FROM citys WHERE name LIKE ?', ('%' + search_term + '%',))  # 模糊查询
-    citys_results = cursor.fetchall()
-    conn.close()
-    result_list = []
-    for city in citys_results:
-        result_list.append(city[2])
-    # 返回两个表的搜索结果
-    return result_list
+    return get_city_index().search(search_term)
 
 
 def search_code_by_name(search_term):
-    update_path()
-    conn = sqlite3.connect(path)
-    cursor = conn.cursor()
+    return get_city_index().code_of(search_term, 101010100)  # 默认城市代码
 
-    cursor.execute('SELECT * FROM citys WHERE name LIKE ?', ('%' + search_term + '%',))  # 模糊查询
-    citys_results = cursor.fetchall()
-    conn.close()
 
-    if citys_results:
-        result = citys_results[0][3]
-    else:
-        result = 101010100  # 默认城市代码
-    # 返回两个表的搜索结果
-    return result
+def search_by_num(search_term):
+    return get_city_index().name_of(search_term, '北京')  # 默认城市
 
 
-def search_by_num(search_term):
-    update_path()
-    conn = sqlite3.connect(path)
-    cursor = conn.cursor()
+def is_night(now=None):  # 夜间（18:00~6:00）
+    hour = (now or datetime.datetime.now()).hour
+    return hour < 6 or hour >= 18
 
-    cursor.execute('SELECT * FROM citys WHERE city_num LIKE ?', ('%' + search_term + '%',))  # 模糊查询
-    citys_results = cursor.fetchall()
 
-    conn.close()
+class WeatherCatalog:  # 天气状态表：每个天气API加载一次，按代码/描述/原始代码建立索引并预先计算图标与背景
+    night_icons = ('0', '1', '3', '13')  # 晴、多云、阵雨、阵雪有夜间图标
+    clear_backgrounds = ('0', '1', '3', '99', '900')  # 晴、多云、阵雨、未知使用日/夜背景
+
+    def __init__(self, api):
+        self.api = api
+        with open(f"{base_directory}/config/data/{api}_status.json", encoding="utf-8") as f:
+            weather_status = json.load(f)
+        self.descriptions = {}  # 代码 -> 描述
+        self.codes = {}  # 描述 -> 代码
+        self.original_codes = {}  # 原始代码（图标代码） -> 代码列表
+        self.icons = {}  # 代码 -> (日间图标, 夜间图标)
+        self.backgrounds = {}  # 代码 -> (日间背景, 夜间背景)
+        for weather in weather_status['weatherinfo']:  # 重复项以第一个为准
+            code = str(weather['code'])
+            original_code = weather.get('original_code')
+            icon_code = str(original_code) if original_code is not None else code
+            self.descriptions.setdefault(code, weather['wea'])
+            self.codes.setdefault(str(weather['wea']), code)
+            self.original_codes.setdefault(icon_code, []).append(code)
+            self.icons.setdefault(code, self.get_icon_paths(icon_code))
+            self.backgrounds.setdefault(code, self.get_background_paths(icon_code))
+        self.unknown_background = self.get_background_paths('99')
+
+    def get_icon_paths(self, icon_code):
+        day = f'{base_directory}/img/weather/{icon_code}.svg'
+        if icon_code in self.night_icons:
+            return day, f'{base_directory}/img/weather/{icon_code}d.svg'
+        return day, day
+
+    def get_background_paths(self, icon_code):
+        if icon_code in self.clear_backgrounds:
+            return 'img/weather/bkg/day.png', 'img/weather/bkg/night.png'
+        return 'img/weather/bkg/rain.png', 'img/weather/bkg/rain.png'
+
+    def description(self, code, default='未知'):
+        return self.descriptions.get(str(code), default)
+
+    def code(self, description, default='99'):
+        return self.codes.get(str(description), default)
+
+    def icon(self, code, night=None):
+        paths = self.icons.get(str(code))
+        if paths is None:
+            logger.error(f'未找到天气代码 {code}')
+            return f'{base_directory}/img/weather/99.svg'
+        return paths[is_night() if night is None else night]
+
+    def background(self, code, night=None):
+        paths = self.backgrounds.get(str(code), self.unknown_background)
+        return paths[is_night() if night is None else night]
+
+
+catalogs = {}  # 天气API -> WeatherCatalog
 
-    if citys_results:
-        result = citys_results[0][2]
-    else:
-        result = '北京'  # 默认城市
-    # 返回两个表的搜索结果
-    return result
+
+def get_catalog(api=None):  # 当前（或指定）天气API的状态表
+    if api is None:
+        api = conf.get_snapshot().weather_api
+    catalog = catalogs.get(api)
+    if catalog is None:
+        catalog = catalogs[api] = WeatherCatalog(api)
+    return catalog
+
+
+def on_api_changed(api=None, city=None):  # 天气API/城市变化时调用：只保留当前API的状态表与适配器
+    if api is None:
+        api = conf.get_snapshot().weather_api
+    for cache in (catalogs, adapters):
+        for name in [name for name in cache if name != api]:
+            del cache[name]
+    get_adapter(api)  # 预先编译新API的取值函数
 
 
 def get_weather_by_code(code):  # 用代码获取天气描述
-    weather_status = json.load(
-        open(f"{base_directory}/config/data/{conf.read_conf('Weather', 'api')}_status.json", encoding="utf-8"))
-    for weather in weather_status['weatherinfo']:
-        if str(weather['code']) == code:
-            return weather['wea']
-    return '未知'
+    return get_catalog().description(code)
 
 
 def get_weather_icon_by_code(code):  # 用代码获取天气图标
-    weather_status = json.load(
-        open(f"{base_directory}/config/data/{conf.read_conf('Weather', 'api')}_status.json",
-             encoding="utf-8")
-    )
-    weather_code = None
-    current_time = datetime.datetime.now()
-    # 遍历获取天气代码
-    for weather in weather_status['weatherinfo']:
-        if str(weather['code']) == code:
-            original_code = weather.get('original_code')
-            if original_code is not None:
-                weather_code = str(weather['original_code'])
-            else:
-                weather_code = str(weather['code'])
-            break
-    if not weather_code:
-        logger.error(f'未找到天气代码 {code}')
-        return f'{base_directory}/img/weather/99.svg'
-    # 根据天气和时间获取天气图标
-    if weather_code in ('0', '1', '3', '13'):  # 晴、多云、阵雨、阵雪
-        if current_time.hour < 6 or current_time.hour >= 18:  # 如果是夜间
-            return f'{base_directory}/img/weather/{weather_code}d.svg'
-    return f'{base_directory}/img/weather/{weather_code}.svg'
+    return get_catalog().icon(code)
 
 
 def get_weather_stylesheet(code):  # 天气背景样式
-    current_time = datetime.datetime.now()
-    weather_status = json.load(
-        open(f"{base_directory}/config/data/{conf.read_conf('Weather', 'api')}_status.json", encoding="utf-8"))
-    weather_code = '99'
-    for weather in weather_status['weatherinfo']:
-        if str(weather['code']) == code:
-            original_code = weather.get('original_code')
-            if original_code is not None:
-                weather_code = str(weather['original_code'])
-            else:
-                weather_code = str(weather['code'])
-            break
-    if weather_code in ('0', '1', '3', '99', '900'):  # 晴、多云、阵雨、未知
-        if 6 <= current_time.hour < 18:  # 如果是日间
-            # return 'spread:pad, x1:0, y1:0, x2:1, y2:1, stop:0 rgba(40, 60, 110, 255), stop:1 rgba(75, 175, 245, 255)'
-            return 'img/weather/bkg/day.png'
-        else:  # 如果是夜间
-            return 'img/weather/bkg/night.png'
-    # return 'spread:pad, x1:0, y1:0, x2:1, y2:1, stop:0 rgba(20, 60, 90, 255), stop:1 rgba(10, 20, 29, 255)'
-    return 'img/weather/bkg/rain.png'
+    return get_catalog().background(code)
 
 
 def get_weather_url():
-    if conf.read_conf('Weather', 'api') in api_config['weather_api_list']:
-        return api_config['weather_api'][conf.read_conf('Weather', 'api')]
+    api = conf.get_snapshot().weather_api
+    if api in api_config['weather_api_list']:
+        return api_config['weather_api'][api]
     else:
         return api_config['weather_api']['xiaomi_weather']
 
 
 def get_weather_alert_url():
-    if not api_config['weather_api_parameters'][conf.read_conf('Weather', 'api')]['alerts']:
+    api = conf.get_snapshot().weather_api
+    if not api_config['weather_api_parameters'][api]['alerts']:
         return 'NotSupported'
-    if conf.read_conf('Weather', 'api') in api_config['weather_api_list']:
-        return api_config['weather_api_parameters'][conf.read_conf('Weather', 'api')]['alerts']['url']
+    if api in api_config['weather_api_list']:
+        return api_config['weather_api_parameters'][api]['alerts']['url']
     else:
         return api_config['weather_api_parameters']['xiaomi_weather']['alerts']['url']
 
 
 def get_weather_code_by_description(value):
-    weather_status = json.load(
-        open(f"{base_directory}/config/data/{conf.read_conf('Weather', 'api')}_status.json", encoding="utf-8"))
-    for weather in weather_status['weatherinfo']:
-        if str(weather['wea']) == value:
-            return str(weather['code'])
-    return '99'
+    return get_catalog().code(value)
 
 
 def get_alert_image(alert_type):
-    alerts_list = api_config['weather_api_parameters'][conf.read_conf('Weather', 'api')]['alerts']['types']
+    alerts_list = api_config['weather_api_parameters'][conf.get_snapshot().weather_api]['alerts']['types']
     return f'{base_directory}/img/weather/alerts/{alerts_list[alert_type]}'
 
 def is_supported_alert():
-    if not api_config['weather_api_parameters'][conf.read_conf('Weather', 'api')]['alerts']:
+    if not api_config['weather_api_parameters'][conf.get_snapshot().weather_api]['alerts']:
         return False
     return True
 
 
+def compile_path(path):  # 把点分路径编译为取值函数（itemgetter 链）
+    getters = tuple(itemgetter(int(part)) if part.isdigit() else itemgetter(part) for part in path.split('.'))
+
+    def extract(data):
+        value = data
+        for getter in getters:
+            if not value:
+                return None
+            value = getter(value)
+        return value
+    return extract
+
+
+class WeatherAdapter:  # 天气API适配器：把 weather_api_parameters 中的路径编译为各字段的取值函数
+    def __init__(self, api):
+        parameters = api_config['weather_api_parameters'][api]
+        root = parameters.get('data_root')  # 实时天气数据所在位置
+        self.api = api
+        self.return_desc = parameters['return_desc']  # 此api返回的是天气描述而不是代码
+        self.paths = {key: f'{root}.{parameters[key]}' if root else parameters[key] for key in ('temp', 'icon')}
+        alerts = parameters.get('alerts')
+        if alerts and alerts.get('type'):  # 预警数据来自单独的请求，不使用 data_root
+            self.paths['alert'] = alerts['type']
+        self.extractors = {key: compile_path(path) for key, path in self.paths.items()}
+
+    def is_valid(self, weather_data):  # 能否取到天气（部分API出错时仍返回 200 与错误信息）
+        try:
+            return self.extractors['icon'](weather_data) is not None
+        except (KeyError, IndexError, TypeError):
+            return False
+
+    def get(self, key, weather_data):
+        extract = self.extractors.get(key)
+        if extract is None:
+            logger.error(f'{self.api} 不支持获取 {key}')
+            return None
+        try:
+            value = extract(weather_data)
+        except (KeyError, IndexError, TypeError):
+            logger.error(f'获取天气参数失败，{self.paths[key]}不存在于{self.api}中')
+            return '错误'
+        if value is None:
+            logger.debug(f'{key}为空')
+            return None
+        value = str(value)
+        if key == 'temp':
+            value += '°'
+        elif key == 'icon' and self.return_desc:
+            value = get_catalog(self.api).code(value)
+        return value
+
+
+adapters = {}  # 天气API -> WeatherAdapter
+
+
+def get_adapter(api=None):  # 当前（或指定）天气API的适配器
+    if api is None:
+        api = conf.get_snapshot().weather_api
+    adapter = adapters.get(api)
+    if adapter is None:
+        adapter = adapters[api] = WeatherAdapter(api)
+    return adapter
+
+
 def get_weather_data(key='temp', weather_data=None):  # 获取天气数据
+    """
+    根据key值获取weather_data中的对应值
+    key值可以为：temp、icon、alert
+    """
     if weather_data is None:
         logger.error('weather_data is None!')
         return None
-    '''
-        根据key值获取weather_data中的对应值
-        key值可以为：temp、icon
-    '''
-    # 各个天气api的可访问值
-    api_parameters = api_config['weather_api_parameters'][conf.read_conf('Weather', 'api')]
-    if key == 'alert':
-        parameter = api_parameters['alerts']['type'].split('.')
-    else:
-        parameter = api_parameters[key].split('.')
-    # 遍历获取值
-    value = weather_data
-    if conf.read_conf('Weather', 'api') == 'amap_weather':
-        value = weather_data['lives'][0][api_parameters[key]]
-    elif conf.read_conf('Weather', 'api') == 'qq_weather':
-        value = str(weather_data['result']['realtime'][0]['infos'][api_parameters[key]])
-    else:
-        for parameter in parameter:
-            if not value:
-                print(f'{key}为空')
-                return None
-            if parameter == '0':
-                value = value[0]
-                continue
-            if parameter in value:
-                value = value[parameter]
-            else:
-                logger.error(f'获取天气参数失败，{parameter}不存在于{conf.read_conf("Weather", "api")}中')
-                return '错误'
-    if key == 'temp':
-        value += '°'
-    elif key == 'icon':  # 修复此代码影响其他天气源的问题
-        if api_parameters['return_desc']:  # 如果此api返回的是天气描述而不是代码
-            value = get_weather_code_by_description(value)
-    return value
+    return get_adapter().get(key, weather_data)
+
+
+class WeatherCacheEntry:  # 一条天气缓存
+    __slots__ = ('time', 'ttl', 'validators', 'data')
+
+    def __init__(self, time_, ttl, validators, data):
+        self.time = time_  # 获取时间（时间戳）
+        self.ttl = ttl  # 有效期（秒）
+        self.validators = validators  # 请求名 -> {'etag': ..., 'last_modified': ...}
+        self.data = data  # {'now': ..., 'alert': ...}
+
+    def age(self):
+        return time.time() - self.time
+
+    def is_fresh(self):
+        return self.age() < self.ttl
+
+    def request_headers(self, name):  # 条件请求头
+        validator = self.validators.get(name) or {}
+        headers = {}
+        if validator.get('etag'):
+            headers['If-None-Match'] = validator['etag']
+        if validator.get('last_modified'):
+            headers['If-Modified-Since'] = validator['last_modified']
+        return headers
+
+
+class WeatherCache:  # 天气数据缓存：按 (天气API, 城市) 保存到磁盘，启动时可立即显示
+    def __init__(self, cache_path):
+        self.path = cache_path
+        self.entries = None  # 'api|城市' -> WeatherCacheEntry
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(api, city):
+        return f'{api}|{city}'
+
+    def load(self):
+        self.entries = {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for key, item in json.load(f).items():
+                    self.entries[key] = WeatherCacheEntry(item['time'], item['ttl'], item['validators'], item['data'])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f'读取天气缓存失败：{e}')
+
+    def get(self, api, city, max_age=None):  # 超过 max_age（秒）的缓存视为不存在
+        with self.lock:
+            if self.entries is None:
+                self.load()
+            entry = self.entries.get(self.key(api, city))
+        if entry is None or (max_age is not None and entry.age() > max_age):
+            return None
+        return entry
+
+    def put(self, api, city, data, validators, ttl):
+        with self.lock:
+            if self.entries is None:
+                self.load()
+            self.entries[self.key(api, city)] = WeatherCacheEntry(time.time(), ttl, validators, data)
+            self.save()
+
+    def save(self):  # 原子写入
+        max_age = conf.get_snapshot().weather_cache_max_age
+        items = {
+            key: {'time': entry.time, 'ttl': entry.ttl, 'validators': entry.validators, 'data': entry.data}
+            for key, entry in self.entries.items() if entry.age() <= max_age  # 顺带清理过旧的缓存
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(f'{self.path}.tmp', 'w', encoding='utf-8') as f:
+                json.dump(items, f, ensure_ascii=False)
+            os.replace(f'{self.path}.tmp', self.path)
+        except Exception as e:
+            logger.error(f'保存天气缓存失败：{e}')
+
+
+weather_cache = WeatherCache(f'{base_directory}/cache/weather.json')
 
 
 if __name__ == '__main__':